@@ -14,7 +14,7 @@ from app.models.comment import LineComment, SummaryComment
 from app.models.file_change import FileChange
 from app.models.ast_node import ASTNode
 from app.models.pr_event import PRMetadata
-from app.services.code_retriever import CodeRetriever
+from app.services.code_retriever import get_code_retriever
 from app.services.redis_client import RedisClient
 from app.analyzers.code_analyzer import CodeAnalyzer
 from app.analyzers.architecture_analyzer import ArchitectureAnalyzer
@@ -65,7 +65,7 @@ class ReviewAgent:
         
         # Initialize services
         self.redis_client = RedisClient()
-        self.code_retriever = CodeRetriever()
+        self.code_retriever = get_code_retriever()
         self.plugin_manager = PluginManager()
         self.code_analyzer = CodeAnalyzer(self.plugin_manager)
         self.architecture_analyzer = ArchitectureAnalyzer()
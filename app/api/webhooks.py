@@ -2,7 +2,6 @@
 Webhook endpoints for Azure DevOps Service Hooks.
 """
 
-import hashlib
 import hmac
 import logging
 from typing import Any, Dict
@@ -36,12 +35,12 @@ def verify_webhook_signature(payload: bytes, signature: str) -> bool:
     if not signature:
         return False
     
-    # Compute expected signature
-    expected_signature = hmac.new(
+    # Compute expected signature; the 'sha256' name takes OpenSSL's one-shot HMAC path
+    expected_signature = hmac.digest(
         settings.webhook_secret.encode(),
         payload,
-        hashlib.sha256
-    ).hexdigest()
+        'sha256'
+    ).hex()
     
     # Compare signatures (constant-time comparison)
     return hmac.compare_digest(signature, expected_signature)
@@ -2,6 +2,7 @@
 Application configuration management.
 """
 
+from functools import lru_cache
 from pydantic_settings import BaseSettings
 from typing import Optional
 
@@ -41,5 +42,16 @@ class Settings(BaseSettings):
         case_sensitive = False
 
 
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """
+    Return the process-wide settings, reading the environment only once.
+    
+    Returns:
+        Settings instance
+    """
+    return Settings()
+
+
 # Global settings instance
-settings = Settings()
+settings = get_settings()
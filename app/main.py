@@ -7,7 +7,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from app.config import settings
 from app.middleware.logging import RequestLoggingMiddleware
 from app.api import webhooks, repositories, agents
-from app.utils.logging import setup_logging, get_logger
+from app.utils.logging import setup_logging, shutdown_logging, get_logger
 
 # Configure structured logging
 setup_logging(settings.log_level)
@@ -97,6 +97,9 @@ async def shutdown_event():
     redis_client = get_redis_client()
     await redis_client.close()
     logger.info("Redis client closed")
+    
+    # Write out any queued log records
+    shutdown_logging()
 
 
 if __name__ == "__main__":
@@ -2,8 +2,10 @@
 Real PR review implementation using Azure DevOps and AI (Groq/Anthropic/Ollama).
 """
 
+import json
 import os
 import logging
+import re
 from typing import List, Dict
 from azure.devops.connection import Connection
 from msrest.authentication import BasicAuthentication
@@ -345,10 +347,6 @@ class PRReviewer:
                     if response.status_code == 200:
                         review_text = response.json().get("response", "").strip()
 
-                # Parse JSON response
-                import json
-                import re
-
                 # Extract JSON from response
                 json_match = re.search(r'\[.*\]', review_text, re.DOTALL)
                 if json_match:
@@ -525,7 +523,6 @@ class PRReviewer:
     def _get_last_reviewed_iteration(self, repository_id: str, pr_id: int) -> int:
         """Get the last reviewed iteration from file storage."""
         try:
-            import json
             state_file = Path(f".pr_state_{repository_id}_{pr_id}.json")
             
             if state_file.exists():
@@ -540,7 +537,6 @@ class PRReviewer:
     def _save_last_reviewed_iteration(self, repository_id: str, pr_id: int, iteration_id: int):
         """Save the last reviewed iteration to file storage."""
         try:
-            import json
             state_file = Path(f".pr_state_{repository_id}_{pr_id}.json")
             
             state = {
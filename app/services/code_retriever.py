@@ -6,7 +6,10 @@ from Azure DevOps pull requests using the Azure DevOps Python SDK.
 """
 
 import asyncio
+import difflib
+import os
 import time
+from functools import lru_cache
 from typing import List, Optional
 from azure.devops.connection import Connection
 from azure.devops.v7_1.git import GitClient
@@ -25,6 +28,14 @@ from app.utils.resilience import CircuitBreaker, create_azure_devops_circuit_bre
 
 logger = get_logger(__name__)
 
+# Single Azure DevOps change types; combined flags fall back to a substring match
+_CHANGE_TYPE_MAP = {
+    'add': ChangeType.ADD,
+    'delete': ChangeType.DELETE,
+    'edit': ChangeType.EDIT,
+    'rename': ChangeType.EDIT,
+}
+
 
 class CodeRetrieverError(Exception):
     """Base exception for Code Retriever errors."""
@@ -53,6 +64,15 @@ class CodeRetriever:
     - Implement retry logic for transient failures
     """
 
+    # Lowercased extensions of files that are skipped as binary
+    _BINARY_EXTS = frozenset({
+        '.png', '.jpg', '.jpeg', '.gif', '.bmp', '.ico', '.svg',
+        '.pdf', '.zip', '.tar', '.gz', '.rar', '.7z',
+        '.exe', '.dll', '.so', '.dylib',
+        '.class', '.jar', '.war',
+        '.woff', '.woff2', '.ttf', '.eot',
+    })
+
     def __init__(
         self,
         organization_url: str,
@@ -61,6 +81,7 @@ class CodeRetriever:
         base_delay: float = 1.0,
         max_delay: float = 60.0,
         circuit_breaker: Optional[CircuitBreaker] = None,
+        git_client: Optional[GitClient] = None,
     ):
         """
         Initialize Code Retriever with Azure DevOps connection.
@@ -72,6 +93,8 @@ class CodeRetriever:
             base_delay: Base delay in seconds for exponential backoff
             max_delay: Maximum delay in seconds between retries
             circuit_breaker: Optional CircuitBreaker instance for fault tolerance
+            git_client: Optional already connected GitClient to reuse. If None,
+                a new Azure DevOps connection is created.
         """
         self.organization_url = organization_url
         self.pat = personal_access_token
@@ -82,20 +105,25 @@ class CodeRetriever:
         # Initialize circuit breaker
         self.circuit_breaker = circuit_breaker or create_azure_devops_circuit_breaker()
         
-        # Initialize Azure DevOps connection
-        credentials = BasicAuthentication('', self.pat)
-        self.connection = Connection(base_url=self.organization_url, creds=credentials)
-        self.git_client: GitClient = self.connection.clients.get_git_client()
+        # Initialize Azure DevOps connection unless a client was provided
+        if git_client is None:
+            credentials = BasicAuthentication('', self.pat)
+            self.connection = Connection(base_url=self.organization_url, creds=credentials)
+            git_client = self.connection.clients.get_git_client()
+        else:
+            self.connection = None
+        self.git_client: GitClient = git_client
         
         logger.info(f"CodeRetriever initialized for organization: {self.organization_url}")
 
-    async def _retry_with_backoff(self, func, *args, **kwargs):
+    async def _retry_with_backoff(self, func, *args, endpoint: Optional[str] = None, **kwargs):
         """
         Execute function with exponential backoff retry logic and circuit breaker.
         
         Args:
             func: Function to execute
             *args: Positional arguments for function
+            endpoint: Endpoint name for API call logs; defaults to func's name
             **kwargs: Keyword arguments for function
             
         Returns:
@@ -107,9 +135,9 @@ class CodeRetriever:
         """
         async def _execute():
             # Run synchronous Azure DevOps SDK calls in thread pool
-            loop = asyncio.get_event_loop()
-            return await loop.run_in_executor(None, lambda: func(*args, **kwargs))
+            return await asyncio.to_thread(func, *args, **kwargs)
         
+        endpoint = endpoint or func.__name__
         last_exception = None
         start_time = time.time()
         
@@ -123,7 +151,7 @@ class CodeRetriever:
                 log_api_call(
                     logger,
                     service="azure_devops",
-                    endpoint=func.__name__,
+                    endpoint=endpoint,
                     method="GET",
                     status_code=200,
                     duration_ms=duration_ms
@@ -144,7 +172,7 @@ class CodeRetriever:
                     log_api_call(
                         logger,
                         service="azure_devops",
-                        endpoint=func.__name__,
+                        endpoint=endpoint,
                         method="GET",
                         status_code=None,
                         duration_ms=duration_ms,
@@ -166,7 +194,7 @@ class CodeRetriever:
                     log_api_call(
                         logger,
                         service="azure_devops",
-                        endpoint=func.__name__,
+                        endpoint=endpoint,
                         method="GET",
                         status_code=None,
                         duration_ms=duration_ms,
@@ -350,9 +378,10 @@ class CodeRetriever:
                 logger.debug(f"Skipping binary file: {file_path}")
                 return None
             
-            # Get file content
-            content_stream = await self._retry_with_backoff(
-                self.git_client.get_item_content,
+            # Get file content; the stream is drained in the worker thread
+            data = await self._retry_with_backoff(
+                self._read_item_content,
+                endpoint="get_item_content",
                 repository_id=repository_id,
                 path=file_path,
                 version_descriptor=GitVersionDescriptor(
@@ -361,8 +390,7 @@ class CodeRetriever:
                 )
             )
             
-            # Read content from stream
-            content = b''.join(content_stream).decode('utf-8', errors='ignore')
+            content = data.decode('utf-8', errors='ignore')
             
             logger.debug(f"Retrieved {len(content)} bytes for {file_path}")
             return content
@@ -372,6 +400,22 @@ class CodeRetriever:
             logger.warning(f"Could not retrieve file content for {file_path}: {e}")
             return None
 
+    def _read_item_content(self, **kwargs) -> bytes:
+        """
+        Download an item and read its whole content stream.
+        
+        get_item_content returns a lazy generator that performs network reads
+        as it is iterated, so it is consumed here, inside the retried call,
+        rather than on the event loop.
+        
+        Args:
+            **kwargs: Keyword arguments for GitClient.get_item_content
+            
+        Returns:
+            Raw item content
+        """
+        return b''.join(self.git_client.get_item_content(**kwargs))
+
     def _is_binary_file(self, file_path: str) -> bool:
         """
         Check if file is binary based on extension.
@@ -382,15 +426,7 @@ class CodeRetriever:
         Returns:
             True if file is binary, False otherwise
         """
-        binary_extensions = {
-            '.png', '.jpg', '.jpeg', '.gif', '.bmp', '.ico', '.svg',
-            '.pdf', '.zip', '.tar', '.gz', '.rar', '.7z',
-            '.exe', '.dll', '.so', '.dylib',
-            '.class', '.jar', '.war',
-            '.woff', '.woff2', '.ttf', '.eot',
-        }
-        
-        return any(file_path.lower().endswith(ext) for ext in binary_extensions)
+        return os.path.splitext(file_path)[1].lower() in self._BINARY_EXTS
 
     def _map_change_type(self, azure_change_type: str) -> ChangeType:
         """
@@ -405,6 +441,11 @@ class CodeRetriever:
         # Azure DevOps change types: add, edit, delete, rename, etc.
         change_type_str = str(azure_change_type).lower()
         
+        change_type = _CHANGE_TYPE_MAP.get(change_type_str)
+        if change_type is not None:
+            return change_type
+        
+        # Combined flags such as "edit, rename"
         if 'add' in change_type_str:
             return ChangeType.ADD
         elif 'delete' in change_type_str:
@@ -421,8 +462,8 @@ class CodeRetriever:
         """
         Parse line-level changes between source and target content.
         
-        This is a simplified implementation that identifies added, modified,
-        and deleted lines by comparing source and target content line by line.
+        Edited files are aligned with difflib so that inserted or removed
+        lines do not shift every following line into the modified set.
         
         Args:
             source_content: Original file content (before changes)
@@ -438,22 +479,18 @@ class CodeRetriever:
         
         # Handle file addition
         if change_type == ChangeType.ADD and target_content:
-            for line_num, line in enumerate(target_content.splitlines(), start=1):
-                added_lines.append(LineChange(
-                    line_number=line_num,
-                    change_type=ChangeType.ADD,
-                    content=line
-                ))
+            added_lines = [
+                LineChange(line_number=line_num, change_type=ChangeType.ADD, content=line)
+                for line_num, line in enumerate(target_content.splitlines(), start=1)
+            ]
             return added_lines, modified_lines, deleted_lines
         
         # Handle file deletion
         if change_type == ChangeType.DELETE and source_content:
-            for line_num, line in enumerate(source_content.splitlines(), start=1):
-                deleted_lines.append(LineChange(
-                    line_number=line_num,
-                    change_type=ChangeType.DELETE,
-                    content=line
-                ))
+            deleted_lines = [
+                LineChange(line_number=line_num, change_type=ChangeType.DELETE, content=line)
+                for line_num, line in enumerate(source_content.splitlines(), start=1)
+            ]
             return added_lines, modified_lines, deleted_lines
         
         # Handle file modification
@@ -461,43 +498,51 @@ class CodeRetriever:
             source_lines = source_content.splitlines()
             target_lines = target_content.splitlines()
             
-            # Simple line-by-line comparison
-            # In production, use a proper diff algorithm (e.g., difflib)
-            max_lines = max(len(source_lines), len(target_lines))
+            # Align the two versions so an inserted or removed line does not
+            # mark every following line as modified. Added and modified lines
+            # are numbered in the target, deleted lines in the source.
+            matcher = difflib.SequenceMatcher(a=source_lines, b=target_lines, autojunk=False)
             
-            for i in range(max_lines):
-                source_line = source_lines[i] if i < len(source_lines) else None
-                target_line = target_lines[i] if i < len(target_lines) else None
+            for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+                if tag == 'equal':
+                    continue
+                
+                # A replaced block pairs lines up as modifications; any
+                # surplus on either side is an addition or a deletion
+                paired = min(i2 - i1, j2 - j1) if tag == 'replace' else 0
                 
-                if source_line is None and target_line is not None:
-                    # Line added
+                for j in range(j1, j1 + paired):
+                    modified_lines.append(LineChange(
+                        line_number=j + 1,
+                        change_type=ChangeType.EDIT,
+                        content=target_lines[j]
+                    ))
+                
+                for j in range(j1 + paired, j2):
                     added_lines.append(LineChange(
-                        line_number=i + 1,
+                        line_number=j + 1,
                         change_type=ChangeType.ADD,
-                        content=target_line
+                        content=target_lines[j]
                     ))
-                elif source_line is not None and target_line is None:
-                    # Line deleted
+                
+                for i in range(i1 + paired, i2):
                     deleted_lines.append(LineChange(
                         line_number=i + 1,
                         change_type=ChangeType.DELETE,
-                        content=source_line
-                    ))
-                elif source_line != target_line:
-                    # Line modified
-                    modified_lines.append(LineChange(
-                        line_number=i + 1,
-                        change_type=ChangeType.EDIT,
-                        content=target_line
+                        content=source_lines[i]
                     ))
         
         return added_lines, modified_lines, deleted_lines
 
 
 
+@lru_cache(maxsize=1)
 def get_code_retriever() -> CodeRetriever:
     """
-    Factory function to create CodeRetriever with settings from config.
+    Return the process-wide CodeRetriever configured from settings.
+    
+    The instance is created once so its Azure DevOps connection and HTTP
+    session are reused across pull requests.
     
     Returns:
         CodeRetriever instance configured with application settings
@@ -15,7 +15,7 @@ from app.models.pr_event import PREvent, PRMetadata
 from app.services.repository_config import RepositoryConfigService
 from app.services.redis_client import RedisClient
 from app.services.agent_orchestrator import AgentOrchestrator
-from app.services.code_retriever import CodeRetriever
+from app.services.code_retriever import CodeRetriever, get_code_retriever
 from app.config import settings
 from app.utils.logging import get_logger, log_pr_event
 
@@ -30,7 +30,6 @@ class PRMonitor:
         self.repo_config = RepositoryConfigService()
         self.redis_client = RedisClient()
         self.orchestrator = AgentOrchestrator()
-        self.code_retriever = CodeRetriever()
         
         # Azure DevOps connection for service hooks
         credentials = BasicAuthentication('', settings.azure_devops_pat)
@@ -40,6 +39,17 @@ class PRMonitor:
         )
         self._service_hooks_client = self._connection.clients.get_service_hooks_client()
     
+    @property
+    def code_retriever(self) -> CodeRetriever:
+        """
+        Shared CodeRetriever, created on first use.
+        
+        Building it opens an Azure DevOps connection and resolves the Git
+        client over HTTP, so it is deferred until a PR event needs it
+        rather than done when the webhook module is imported.
+        """
+        return get_code_retriever()
+    
     async def process_pr_event(self, event: PREvent) -> None:
         """
         Process incoming PR event and spawn review agent if needed.
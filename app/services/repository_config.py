@@ -17,6 +17,11 @@ from app.models.repository import Repository, RepositoryCreate
 
 logger = logging.getLogger(__name__)
 
+# https://dev.azure.com/{org}/{project}/_git/{repo}, with an optional trailing slash
+_AZURE_DEVOPS_URL_PATTERN = re.compile(
+    r'^https://dev\.azure\.com/(?P<org>[^/]+)/(?P<project>[^/]+)/_git/(?P<repo>[^/]+)/?$'
+)
+
 
 class RepositoryValidationError(Exception):
     """Raised when repository URL validation fails."""
@@ -31,6 +36,9 @@ class RepositoryConfigService:
     including URL validation and Azure DevOps repository parsing.
     """
     
+    # Compiled once at import and shared by all instances
+    _azure_devops_url_pattern = _AZURE_DEVOPS_URL_PATTERN
+    
     def __init__(self, database_url: Optional[str] = None):
         """
         Initialize the repository configuration service.
@@ -40,9 +48,6 @@ class RepositoryConfigService:
         """
         self._pool: Optional[aiomysql.Pool] = None
         self._database_url = database_url
-        self._azure_devops_url_pattern = re.compile(
-            r'^https://dev\.azure\.com/(?P<org>[^/]+)/(?P<project>[^/]+)/_git/(?P<repo>[^/]+)/?$'
-        )
     
     async def initialize(self) -> None:
         """
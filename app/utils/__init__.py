@@ -5,6 +5,7 @@ Utility modules for the PR Review Agent.
 from app.utils.logging import (
     get_logger,
     setup_logging,
+    shutdown_logging,
     LogContext,
     log_pr_event,
     log_phase_transition,
@@ -20,6 +21,7 @@ from app.utils.metrics import (
 __all__ = [
     "get_logger",
     "setup_logging",
+    "shutdown_logging",
     "LogContext",
     "log_pr_event",
     "log_phase_transition",
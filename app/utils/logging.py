@@ -8,13 +8,92 @@ This module provides structured logging capabilities with:
 - Integration with Python's standard logging module
 """
 
+import atexit
+import copy
 import logging
 import json
+import os
+import queue
 import sys
+import time
 import traceback
-from datetime import datetime, timezone
+from functools import lru_cache
 from typing import Any, Dict, Optional, MutableMapping
 from logging import LogRecord
+from logging.handlers import QueueHandler, QueueListener
+
+# Prefer orjson for encoding log records; fall back to the stdlib encoder
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _dumps(data: Dict[str, Any]) -> str:
+    """
+    Serialize a log record dict to a JSON string.
+    
+    Values that are not JSON serializable are written using str(), and
+    non-string keys are coerced as the stdlib encoder does.
+    
+    Args:
+        data: Log record fields
+        
+    Returns:
+        JSON string
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(data, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+        except TypeError:
+            # e.g. integers wider than 64 bits, which default= never sees
+            pass
+    return json.dumps(data, default=str)
+
+
+# (epoch second, "YYYY-MM-DDTHH:MM:SS") for the most recently formatted second
+_timestamp_cache: tuple[int, str] = (-1, "")
+
+
+def _format_timestamp(created: float) -> str:
+    """
+    Format an epoch timestamp as ISO 8601 UTC with microseconds.
+    
+    The date and time part is cached per second, since consecutive records
+    almost always fall in the same one.
+    
+    Args:
+        created: Seconds since the epoch (LogRecord.created)
+        
+    Returns:
+        Timestamp such as 2024-01-01T12:00:00.123456Z
+    """
+    global _timestamp_cache
+    
+    seconds = int(created)
+    cached_seconds, prefix = _timestamp_cache
+    if seconds != cached_seconds:
+        prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(seconds))
+        _timestamp_cache = (seconds, prefix)
+    
+    return f"{prefix}.{int((created - seconds) * 1_000_000):06d}Z"
+
+
+# Context fields promoted to the top level of the JSON output
+_PROMOTED_FIELDS = ("agent_id", "pr_id", "phase", "repository_id", "request_id")
+
+# Record attribute carrying a ContextLoggerAdapter's pre-encoded context
+_CONTEXT_JSON_ATTR = "_context_json"
+
+# Attributes every LogRecord carries, plus the promoted fields; anything else
+# on a record came from `extra` and is reported under "context"
+_RESERVED_ATTRS = frozenset({
+    "name", "msg", "args", "created", "filename", "funcName",
+    "levelname", "levelno", "lineno", "module", "msecs",
+    "message", "pathname", "process", "processName", "relativeCreated",
+    "thread", "threadName", "exc_info", "exc_text", "stack_info", "taskName",
+    _CONTEXT_JSON_ATTR,
+}) | frozenset(_PROMOTED_FIELDS)
 
 
 class JSONFormatter(logging.Formatter):
@@ -41,35 +120,29 @@ class JSONFormatter(logging.Formatter):
             JSON formatted log string
         """
         log_data: Dict[str, Any] = {
-            "timestamp": datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z'),
+            # Taken from the record, which may be formatted later on the listener thread
+            "timestamp": _format_timestamp(record.created),
             "level": record.levelname,
             "logger": record.name,
             "message": record.getMessage(),
         }
         
+        record_fields = record.__dict__
+        
+        # Promoted fields from a logger adapter's context arrive pre-encoded
+        context_fragment, encoded_fields = record_fields.get(_CONTEXT_JSON_ATTR, ("", ()))
+        
         # Add context fields from extra
-        if hasattr(record, "agent_id"):
-            log_data["agent_id"] = record.agent_id
-        if hasattr(record, "pr_id"):
-            log_data["pr_id"] = record.pr_id
-        if hasattr(record, "phase"):
-            log_data["phase"] = record.phase
-        if hasattr(record, "repository_id"):
-            log_data["repository_id"] = record.repository_id
-        if hasattr(record, "request_id"):
-            log_data["request_id"] = record.request_id
+        for key in _PROMOTED_FIELDS:
+            if key in record_fields and key not in encoded_fields:
+                log_data[key] = record_fields[key]
         
         # Add any other extra fields
-        extra_fields = {}
-        for key, value in record.__dict__.items():
-            if key not in [
-                "name", "msg", "args", "created", "filename", "funcName",
-                "levelname", "levelno", "lineno", "module", "msecs",
-                "message", "pathname", "process", "processName", "relativeCreated",
-                "thread", "threadName", "exc_info", "exc_text", "stack_info",
-                "agent_id", "pr_id", "phase", "repository_id", "request_id"
-            ]:
-                extra_fields[key] = value
+        extra_fields = {
+            key: value
+            for key, value in record_fields.items()
+            if key not in _RESERVED_ATTRS
+        }
         
         if extra_fields:
             log_data["context"] = extra_fields
@@ -89,7 +162,10 @@ class JSONFormatter(logging.Formatter):
             "function": record.funcName
         }
         
-        return json.dumps(log_data)
+        encoded = _dumps(log_data)
+        if context_fragment:
+            return f"{encoded[:-1]},{context_fragment}}}"
+        return encoded
 
 
 class LogContext:
@@ -116,7 +192,8 @@ class LogContext:
     def __enter__(self) -> logging.LoggerAdapter:
         """Enter context and add fields to logger."""
         self.old_extra = self.logger.extra.copy() if self.logger.extra else {}
-        self.logger.extra.update(self.context)
+        # Replace rather than update in place so the adapter re-encodes its context
+        self.logger.extra = {**self.old_extra, **self.context}
         return self.logger
     
     def __exit__(self, exc_type, exc_val, exc_tb):
@@ -131,6 +208,10 @@ class ContextLoggerAdapter(logging.LoggerAdapter):
     
     This adapter allows setting context fields (agent_id, pr_id, phase)
     that will be automatically included in all log entries.
+    
+    The promoted context fields are JSON-encoded once and passed to
+    JSONFormatter with each record. Assign a new dict to `extra` to change
+    the context; mutating it in place leaves the encoded copy stale.
     """
     
     def __init__(self, logger: logging.Logger, extra: Optional[Dict[str, Any]] = None):
@@ -143,6 +224,29 @@ class ContextLoggerAdapter(logging.LoggerAdapter):
         """
         super().__init__(logger, extra or {})
     
+    @property
+    def extra(self) -> Dict[str, Any]:
+        """Context fields injected into every record."""
+        return self._extra
+    
+    @extra.setter
+    def extra(self, value: Dict[str, Any]) -> None:
+        self._extra = value
+        self._context_json: Optional[tuple[str, frozenset]] = None
+    
+    def _get_context_json(self) -> tuple[str, frozenset]:
+        """
+        Get the promoted context fields as a JSON fragment.
+        
+        Returns:
+            Tuple of (fragment without braces, names of the encoded fields)
+        """
+        if self._context_json is None:
+            promoted = {key: self._extra[key] for key in _PROMOTED_FIELDS if key in self._extra}
+            fragment = _dumps(promoted)[1:-1] if promoted else ""
+            self._context_json = (fragment, frozenset(promoted))
+        return self._context_json
+    
     def process(self, msg: str, kwargs: MutableMapping[str, Any]) -> tuple[str, MutableMapping[str, Any]]:
         """
         Process log message and inject context.
@@ -157,6 +261,7 @@ class ContextLoggerAdapter(logging.LoggerAdapter):
         # Merge extra fields
         extra = kwargs.get("extra", {})
         extra.update(self.extra)
+        extra[_CONTEXT_JSON_ATTR] = self._get_context_json()
         kwargs["extra"] = extra
         return msg, kwargs
     
@@ -175,6 +280,92 @@ class ContextLoggerAdapter(logging.LoggerAdapter):
         return ContextLoggerAdapter(self.logger, new_extra)
 
 
+class _RecordQueueHandler(QueueHandler):
+    """
+    Queue handler that hands records to the listener thread unformatted.
+    
+    QueueHandler.prepare formats the record and drops exc_info so that it
+    can be pickled; the queue here never leaves the process, so the record
+    is passed on with its exception info intact for JSONFormatter.
+    """
+    
+    def prepare(self, record: LogRecord) -> LogRecord:
+        """
+        Prepare a record for queuing.
+        
+        Args:
+            record: Log record to enqueue
+            
+        Returns:
+            Copy of the record with its message already merged with args
+        """
+        record = copy.copy(record)
+        # Merge args now; they may be mutated by the caller before the
+        # listener gets to the record
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+class _FileDescriptorHandler(logging.Handler):
+    """
+    Handler that writes formatted records straight to a file descriptor.
+    
+    Each record is written with os.write, skipping the text stream layer.
+    """
+    
+    terminator = "\n"
+    
+    def __init__(self, fd: int):
+        """
+        Initialize the handler.
+        
+        Args:
+            fd: File descriptor to write to
+        """
+        super().__init__()
+        self.fd = fd
+    
+    def emit(self, record: LogRecord) -> None:
+        """
+        Write a formatted record to the file descriptor.
+        
+        Args:
+            record: Log record to write
+        """
+        try:
+            data = (self.format(record) + self.terminator).encode()
+            # os.write may write less than requested, e.g. to a full pipe
+            while data:
+                data = data[os.write(self.fd, data):]
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+
+def _console_handler() -> logging.Handler:
+    """
+    Create the handler that writes log records to stdout.
+    
+    Returns:
+        File descriptor handler, or a StreamHandler when stdout has no
+        file descriptor (e.g. when it is replaced by an in-memory stream)
+    """
+    try:
+        fd = sys.stdout.fileno()
+    except (AttributeError, OSError, ValueError):
+        return logging.StreamHandler(sys.stdout)
+    
+    # Push out anything already buffered so the two writers stay in order
+    sys.stdout.flush()
+    return _FileDescriptorHandler(fd)
+
+
+# Listener that formats and writes queued records, started by setup_logging
+_queue_listener: Optional[QueueListener] = None
+
+
 def setup_logging(log_level: str = "INFO") -> None:
     """
     Configure structured logging for the application.
@@ -184,22 +375,35 @@ def setup_logging(log_level: str = "INFO") -> None:
     - Console handler with appropriate log level
     - Root logger configuration
     
+    Logging calls only enqueue the record; formatting and writing happen on
+    a background listener thread so they stay off request paths. Call
+    shutdown_logging to flush the queue.
+    
     Args:
         log_level: Log level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
     """
+    global _queue_listener
+    
     # Create JSON formatter
     formatter = JSONFormatter()
     
     # Configure console handler
-    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler = _console_handler()
     console_handler.setFormatter(formatter)
     console_handler.setLevel(log_level)
     
+    # Stop the listener from a previous call before replacing handlers
+    shutdown_logging()
+    
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    _queue_listener = QueueListener(log_queue, console_handler, respect_handler_level=True)
+    _queue_listener.start()
+    
     # Configure root logger
     root_logger = logging.getLogger()
     root_logger.setLevel(log_level)
     root_logger.handlers.clear()
-    root_logger.addHandler(console_handler)
+    root_logger.addHandler(_RecordQueueHandler(log_queue))
     
     # Reduce noise from third-party libraries
     logging.getLogger("urllib3").setLevel(logging.WARNING)
@@ -209,6 +413,39 @@ def setup_logging(log_level: str = "INFO") -> None:
     logging.getLogger("httpcore").setLevel(logging.WARNING)
 
 
+def shutdown_logging() -> None:
+    """
+    Flush queued log records and stop the background listener.
+    
+    The listener's handlers are attached directly to the root logger, so
+    anything logged afterwards is still written, synchronously.
+    """
+    global _queue_listener
+    
+    listener = _queue_listener
+    if listener is None:
+        return
+    
+    _queue_listener = None
+    listener.stop()
+    
+    root_logger = logging.getLogger()
+    for handler in list(root_logger.handlers):
+        if isinstance(handler, _RecordQueueHandler):
+            root_logger.removeHandler(handler)
+    for handler in listener.handlers:
+        root_logger.addHandler(handler)
+
+
+# Runs before logging's own atexit hook, so queued records are written first
+atexit.register(shutdown_logging)
+
+
+# Loggers are never removed from the logging manager, so lookups can be
+# cached; this skips the module-level lock logging.getLogger takes per call
+_get_base_logger = lru_cache(maxsize=1024)(logging.getLogger)
+
+
 def get_logger(name: str, **context: Any) -> ContextLoggerAdapter:
     """
     Get a context-aware logger for a module.
@@ -223,8 +460,10 @@ def get_logger(name: str, **context: Any) -> ContextLoggerAdapter:
     Example:
         logger = get_logger(__name__, agent_id="agent_123", pr_id="456")
         logger.info("Starting analysis")  # Will include agent_id and pr_id
+    
+    Each call returns a new adapter, as adapters carry mutable context.
     """
-    base_logger = logging.getLogger(name)
+    base_logger = _get_base_logger(name)
     return ContextLoggerAdapter(base_logger, context)
 
 
@@ -8,7 +8,9 @@ This module provides metrics tracking for:
 - Storage in agent_executions table
 """
 
+import logging
 import time
+from array import array
 from datetime import datetime, timezone
 from typing import Optional, Dict, Any
 from contextlib import asynccontextmanager
@@ -17,6 +19,11 @@ from app.utils.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Positions in a service's latency stats array
+_LATENCY_SUM = 0
+_LATENCY_MIN = 1
+_LATENCY_MAX = 2
+
 
 class MetricsCollector:
     """
@@ -28,8 +35,27 @@ class MetricsCollector:
     - Summary comment generation
     - API call counts and latency
     - Errors
+    
+    One collector is created per review, so attributes are kept in slots
+    rather than a per-instance dict.
     """
     
+    __slots__ = (
+        "agent_id",
+        "pr_id",
+        "repository_id",
+        "start_time",
+        "end_time",
+        "duration_ms",
+        "line_comments_count",
+        "summary_comment_generated",
+        "files_analyzed",
+        "api_calls",
+        "api_latency_stats",
+        "status",
+        "error_message",
+    )
+    
     def __init__(self, agent_id: str, pr_id: str, repository_id: str):
         """
         Initialize metrics collector.
@@ -53,9 +79,10 @@ class MetricsCollector:
         self.summary_comment_generated: bool = False
         self.files_analyzed: int = 0
         
-        # API metrics
+        # API metrics, with latency kept as running totals per service:
+        # array('d', [sum, min, max]) of C doubles
         self.api_calls: Dict[str, int] = {}
-        self.api_latencies: Dict[str, list[float]] = {}
+        self.api_latency_stats: Dict[str, array] = {}
         
         # Status
         self.status: str = "running"
@@ -141,10 +168,17 @@ class MetricsCollector:
         # Increment call count
         self.api_calls[service] = self.api_calls.get(service, 0) + 1
         
-        # Record latency
-        if service not in self.api_latencies:
-            self.api_latencies[service] = []
-        self.api_latencies[service].append(duration_ms)
+        # Update running latency stats
+        stats = self.api_latency_stats.get(service)
+        if stats is None:
+            self.api_latency_stats[service] = array('d', (duration_ms, duration_ms, duration_ms))
+            return
+        
+        stats[_LATENCY_SUM] += duration_ms
+        if duration_ms < stats[_LATENCY_MIN]:
+            stats[_LATENCY_MIN] = duration_ms
+        if duration_ms > stats[_LATENCY_MAX]:
+            stats[_LATENCY_MAX] = duration_ms
     
     def get_metrics_summary(self) -> Dict[str, Any]:
         """
@@ -168,16 +202,16 @@ class MetricsCollector:
         }
         
         # Add API latency statistics
-        if self.api_latencies:
+        if self.api_latency_stats:
             latency_stats = {}
-            for service, latencies in self.api_latencies.items():
-                if latencies:
-                    latency_stats[service] = {
-                        "count": len(latencies),
-                        "min_ms": round(min(latencies), 2),
-                        "max_ms": round(max(latencies), 2),
-                        "avg_ms": round(sum(latencies) / len(latencies), 2),
-                    }
+            for service, stats in self.api_latency_stats.items():
+                count = self.api_calls[service]
+                latency_stats[service] = {
+                    "count": count,
+                    "min_ms": round(stats[_LATENCY_MIN], 2),
+                    "max_ms": round(stats[_LATENCY_MAX], 2),
+                    "avg_ms": round(stats[_LATENCY_SUM] / count, 2),
+                }
             summary["api_latencies"] = latency_stats
         
         if self.error_message:
@@ -297,11 +331,17 @@ def emit_metric(metric_name: str, value: float, **tags: Any) -> None:
     For hackathon, this logs the metric. In production, this could
     send to Prometheus, CloudWatch, DataDog, etc.
     
+    When the metrics logger has INFO disabled there is no sink, and the call
+    returns before building the message.
+    
     Args:
         metric_name: Metric name
         value: Metric value
         **tags: Metric tags/labels
     """
+    if not logger.isEnabledFor(logging.INFO):
+        return
+    
     logger.info(
         f"Metric: {metric_name}",
         extra={
@@ -6,12 +6,14 @@ and analysis rule definitions using tree-sitter-typescript.
 """
 
 import logging
+import weakref
+from bisect import bisect_right
 from pathlib import Path
 from typing import List, Optional, Dict, Any
 import tree_sitter
 import yaml
 
-from plugins.base import LanguagePlugin
+from plugins.base import LanguagePlugin, load_language
 from app.models.analysis import (
     ASTNode,
     CodeContext,
@@ -27,12 +29,18 @@ logger = logging.getLogger(__name__)
 class AngularPlugin(LanguagePlugin):
     """Angular/TypeScript language analysis plugin using tree-sitter."""
     
-    def __init__(self, config_path: Optional[Path] = None):
+    def __init__(
+        self,
+        config_path: Optional[Path] = None,
+        language: Optional[tree_sitter.Language] = None
+    ):
         """
         Initialize the Angular plugin.
         
         Args:
             config_path: Path to config.yaml file. If None, uses default location.
+            language: Already loaded tree-sitter TypeScript language. If None,
+                the shared instance from load_language is used.
         """
         # Load configuration
         if config_path is None:
@@ -41,29 +49,15 @@ class AngularPlugin(LanguagePlugin):
         with open(config_path, 'r') as f:
             self._config = yaml.safe_load(f)
         
-        # Initialize tree-sitter parser
+        # Initialize tree-sitter parser with the process-wide TypeScript
+        # language unless one was provided
+        if language is None:
+            language = load_language('typescript')
         self._parser = tree_sitter.Parser()
+        self._parser.set_language(language)
         
-        # Determine library path based on platform
-        import sys
-        if sys.platform == "darwin":
-            lib_extension = "dylib"
-        elif sys.platform == "win32":
-            lib_extension = "dll"
-        else:
-            lib_extension = "so"
-        
-        lib_path = Path("build") / f"languages.{lib_extension}"
-        
-        if not lib_path.exists():
-            raise FileNotFoundError(
-                f"Tree-sitter library not found at {lib_path}. "
-                "Please run build_grammars.py first."
-            )
-        
-        # Load TypeScript language
-        typescript_language = tree_sitter.Language(str(lib_path), 'typescript')
-        self._parser.set_language(typescript_language)
+        # File-level context shared by every line of a parsed file, keyed by AST identity
+        self._context_cache: Dict[int, Dict[str, Any]] = {}
         
         logger.info("Angular plugin initialized successfully")
     
@@ -174,8 +168,8 @@ class AngularPlugin(LanguagePlugin):
         if enclosing_class:
             decorators = self._extract_decorators(enclosing_class)
         
-        # Extract imports
-        imports = self._extract_imports(ast)
+        # Imports and split lines are computed once per file
+        file_context = self._get_file_context(ast, file_content)
         
         # Extract method signature if method found
         method_signature = None
@@ -183,7 +177,9 @@ class AngularPlugin(LanguagePlugin):
             method_signature = self._extract_method_signature(enclosing_method)
         
         # Get surrounding lines
-        surrounding_lines = self._get_surrounding_lines(file_content, line_number, 3)
+        surrounding_lines = self._get_surrounding_lines(
+            file_context["lines"], line_number, 3
+        )
         
         # Extract class name
         class_name = None
@@ -196,11 +192,39 @@ class AngularPlugin(LanguagePlugin):
             line_number=line_number,
             enclosing_class=class_name,
             enclosing_method=method_signature,
-            imports=imports,
+            imports=file_context["imports"],
             decorators=decorators,
             surrounding_lines=surrounding_lines
         )
     
+    def _get_file_context(self, ast: ASTNode, file_content: str) -> Dict[str, Any]:
+        """
+        Get file-level context that does not depend on the analyzed line.
+        
+        extract_context is called for every changed line and rule of a file,
+        so the imports and the split file content are cached per AST and
+        reused. The entry is dropped when the AST is garbage collected.
+        
+        Args:
+            ast: Parsed AST of the file
+            file_content: Complete file content
+            
+        Returns:
+            Dictionary with 'imports' and 'lines' entries
+        """
+        cache_key = id(ast)
+        file_context = self._context_cache.get(cache_key)
+        
+        if file_context is None:
+            file_context = {
+                "imports": self._extract_imports(ast),
+                "lines": file_content.split('\n'),
+            }
+            self._context_cache[cache_key] = file_context
+            weakref.finalize(ast, self._context_cache.pop, cache_key, None)
+        
+        return file_context
+    
     def _find_enclosing_node(
         self, 
         ast: ASTNode, 
@@ -210,6 +234,11 @@ class AngularPlugin(LanguagePlugin):
         """
         Find the most specific (innermost) enclosing node of a specific type for a given line.
         
+        Children are ordered by position, so only the children whose spans
+        cover the line are descended into, located with a binary search on
+        start_line. The result matches a full in-order search: the first
+        covering child containing a match wins.
+        
         Args:
             ast: Root AST node
             line_number: Target line number (1-indexed)
@@ -218,17 +247,25 @@ class AngularPlugin(LanguagePlugin):
         Returns:
             ASTNode if found, None otherwise
         """
-        # First, recursively search children to find the most specific match
-        for child in ast.children:
+        if not (ast.start_line <= line_number <= ast.end_line):
+            return None
+        
+        # Children up to the rightmost one starting at or before the line.
+        # Siblings only share boundary lines, so the ones covering the line
+        # are the run ending there, e.g. a method and a trailing "} // end f"
+        children = ast.children
+        end = bisect_right(children, line_number, key=lambda child: child.start_line)
+        start = end
+        while start > 0 and children[start - 1].end_line >= line_number:
+            start -= 1
+        
+        for child in children[start:end]:
             result = self._find_enclosing_node(child, line_number, node_type)
             if result:
                 return result
         
-        # If no child matched, check if current node matches and contains the line
-        if (ast.node_type == node_type and 
-            ast.start_line <= line_number <= ast.end_line):
+        if ast.node_type == node_type:
             return ast
-        
         return None
     
     def _extract_decorators(self, class_node: ASTNode) -> List[str]:
@@ -335,7 +372,7 @@ class AngularPlugin(LanguagePlugin):
     
     def _get_surrounding_lines(
         self, 
-        content: str, 
+        lines: List[str], 
         line_number: int, 
         context_size: int = 3
     ) -> List[str]:
@@ -343,15 +380,13 @@ class AngularPlugin(LanguagePlugin):
         Get lines surrounding the target line.
         
         Args:
-            content: File content
+            lines: File content split into lines
             line_number: Target line number (1-indexed)
             context_size: Number of lines before and after to include
             
         Returns:
             List of surrounding line strings
         """
-        lines = content.split('\n')
-        
         # Calculate range (convert to 0-indexed)
         start = max(0, line_number - context_size - 1)
         end = min(len(lines), line_number + context_size)
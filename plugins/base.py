@@ -5,11 +5,71 @@ This module defines the abstract base class that all language plugins must imple
 to provide language-specific code analysis capabilities.
 """
 
+import sys
 from abc import ABC, abstractmethod
-from typing import List, Optional, Dict, Any
+from pathlib import Path
+from typing import List, Optional, Dict, Any, Tuple
+import tree_sitter
 from app.models.analysis import ASTNode, CodeContext, AnalysisRule, CodeIssue, DesignPattern
 
 
+# Loaded grammars keyed by (library path, language name)
+_language_cache: Dict[Tuple[str, str], tree_sitter.Language] = {}
+
+
+def grammar_library_path() -> Path:
+    """
+    Get the path of the compiled tree-sitter grammar library.
+    
+    Returns:
+        Path to build/languages.<ext> for the current platform
+    """
+    # Determine library path based on platform
+    if sys.platform == "darwin":
+        lib_extension = "dylib"
+    elif sys.platform == "win32":
+        lib_extension = "dll"
+    else:
+        lib_extension = "so"
+    
+    return Path("build") / f"languages.{lib_extension}"
+
+
+def load_language(language_name: str) -> tree_sitter.Language:
+    """
+    Load a tree-sitter language from the compiled grammar library.
+    
+    Languages are cached for the lifetime of the process, so the shared
+    library is opened and its symbol looked up once per language instead of
+    once per plugin instance.
+    
+    Args:
+        language_name: Grammar name inside the library (e.g., 'java')
+        
+    Returns:
+        tree-sitter Language for the grammar
+        
+    Raises:
+        FileNotFoundError: If the grammar library has not been built
+    """
+    lib_path = grammar_library_path()
+    
+    cache_key = (str(lib_path), language_name)
+    language = _language_cache.get(cache_key)
+    
+    if language is None:
+        if not lib_path.exists():
+            raise FileNotFoundError(
+                f"Tree-sitter library not found at {lib_path}. "
+                "Please run build_grammars.py first."
+            )
+        
+        language = tree_sitter.Language(str(lib_path), language_name)
+        _language_cache[cache_key] = language
+    
+    return language
+
+
 class LanguagePlugin(ABC):
     """Base interface for language-specific analysis plugins."""
     
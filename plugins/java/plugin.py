@@ -5,13 +5,18 @@ This plugin provides Java-specific code parsing, context extraction,
 and analysis rule definitions using tree-sitter-java.
 """
 
+import asyncio
 import logging
+import sys
+import threading
+import weakref
+from bisect import bisect_right
 from pathlib import Path
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Set, FrozenSet
 import tree_sitter
 import yaml
 
-from plugins.base import LanguagePlugin
+from plugins.base import LanguagePlugin, load_language
 from app.models.analysis import (
     ASTNode,
     CodeContext,
@@ -21,49 +26,80 @@ from app.models.analysis import (
 )
 from app.models.comment import CommentSeverity, CommentCategory
 
+# Prefer the libyaml C loader when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
 logger = logging.getLogger(__name__)
 
+# Composite node types whose text is kept on the AST (tokens always keep theirs)
+_TEXT_NODE_TYPES = frozenset({"import_declaration", "formal_parameters"})
+
+# Modifier keywords required on a Singleton's instance field
+_PRIVATE_STATIC = frozenset({"private", "static"})
+
+# Structural markers that together identify each design pattern
+_SINGLETON_MARKERS = frozenset({"private_static_field", "private_constructor", "static_get_instance"})
+_FACTORY_MARKERS = frozenset({"factory_method"})
+_BUILDER_MARKERS = frozenset({"builder_class", "build_method"})
+_ALL_PATTERN_MARKERS = _SINGLETON_MARKERS | _FACTORY_MARKERS | _BUILDER_MARKERS
+
+# (pattern_name, pattern_type, required markers, description) for detect_patterns
+_PATTERN_DEFINITIONS = (
+    ("Singleton", "creational", _SINGLETON_MARKERS,
+     "Singleton pattern detected with private constructor and static instance"),
+    ("Factory", "creational", _FACTORY_MARKERS,
+     "Factory pattern detected with factory method for object creation"),
+    ("Builder", "creational", _BUILDER_MARKERS,
+     "Builder pattern detected with fluent interface for object construction"),
+)
+
 
 class JavaPlugin(LanguagePlugin):
     """Java language analysis plugin using tree-sitter."""
     
-    def __init__(self, config_path: Optional[Path] = None):
+    def __init__(
+        self,
+        config_path: Optional[Path] = None,
+        config: Optional[Dict[str, Any]] = None,
+        language: Optional[tree_sitter.Language] = None
+    ):
         """
         Initialize the Java plugin.
         
         Args:
             config_path: Path to config.yaml file. If None, uses default location.
+            config: Already parsed configuration, e.g. from
+                PluginManager.load_plugin_config. Skips reading config_path.
+            language: Already loaded tree-sitter Java language. If None, the
+                shared instance from load_language is used.
         """
         # Load configuration
-        if config_path is None:
-            config_path = Path(__file__).parent / "config.yaml"
-        
-        with open(config_path, 'r') as f:
-            self._config = yaml.safe_load(f)
-        
-        # Initialize tree-sitter parser
-        self._parser = tree_sitter.Parser()
-        
-        # Determine library path based on platform
-        import sys
-        if sys.platform == "darwin":
-            lib_extension = "dylib"
-        elif sys.platform == "win32":
-            lib_extension = "dll"
-        else:
-            lib_extension = "so"
-        
-        lib_path = Path("build") / f"languages.{lib_extension}"
-        
-        if not lib_path.exists():
-            raise FileNotFoundError(
-                f"Tree-sitter library not found at {lib_path}. "
-                "Please run build_grammars.py first."
-            )
+        if config is None:
+            if config_path is None:
+                config_path = Path(__file__).parent / "config.yaml"
+            
+            with open(config_path, 'r') as f:
+                config = yaml.load(f, Loader=SafeLoader)
         
-        # Load Java language
-        java_language = tree_sitter.Language(str(lib_path), 'java')
-        self._parser.set_language(java_language)
+        self._config = config
+        
+        # Use the process-wide Java language unless one was provided
+        if language is None:
+            language = load_language('java')
+        self._language = language
+        
+        # tree-sitter parsers are not thread-safe, so each worker thread
+        # gets its own parser (see _get_parser)
+        self._thread_local = threading.local()
+        
+        # File-level context shared by every line of a parsed file, keyed by AST identity
+        self._context_cache: Dict[int, Dict[str, Any]] = {}
+        
+        # Analysis rules depend only on the configuration, so they are built once
+        self._rules_cache: Optional[List[AnalysisRule]] = None
         
         logger.info("Java plugin initialized successfully")
     
@@ -92,14 +128,9 @@ class JavaPlugin(LanguagePlugin):
             ValueError: If the file cannot be parsed
         """
         try:
-            # Parse the content
-            tree = self._parser.parse(bytes(content, "utf8"))
-            
-            if tree.root_node is None:
-                raise ValueError(f"Failed to parse Java file: {file_path}")
-            
-            # Convert tree-sitter node to our ASTNode model
-            ast_node = self._convert_to_ast_node(tree.root_node, content)
+            # Parsing is CPU-bound, so run it off the event loop; tree-sitter
+            # releases the GIL while parsing, letting files parse in parallel
+            ast_node = await asyncio.to_thread(self._parse_content, file_path, content)
             
             logger.debug(f"Successfully parsed Java file: {file_path}")
             return ast_node
@@ -108,38 +139,132 @@ class JavaPlugin(LanguagePlugin):
             logger.error(f"Error parsing Java file {file_path}: {e}")
             raise ValueError(f"Failed to parse Java file: {e}")
     
+    def _parse_content(self, file_path: str, content: str) -> ASTNode:
+        """
+        Parse content and convert it to an ASTNode synchronously.
+        
+        Args:
+            file_path: Path to the file being parsed
+            content: File content as string
+            
+        Returns:
+            ASTNode representing the root of the parsed AST
+            
+        Raises:
+            ValueError: If the file cannot be parsed
+        """
+        source = bytes(content, "utf8")
+        tree = self._get_parser().parse(source)
+        
+        if tree.root_node is None:
+            raise ValueError(f"Failed to parse Java file: {file_path}")
+        
+        # Convert tree-sitter node to our ASTNode model
+        return self._convert_to_ast_node(tree.root_node, source)
+    
+    def _get_parser(self) -> tree_sitter.Parser:
+        """
+        Get the tree-sitter parser for the current thread, creating it on first use.
+        
+        Returns:
+            tree-sitter Parser configured for Java
+        """
+        parser = getattr(self._thread_local, "parser", None)
+        
+        if parser is None:
+            parser = tree_sitter.Parser()
+            parser.set_language(self._language)
+            self._thread_local.parser = parser
+        
+        return parser
+    
     def _convert_to_ast_node(
         self, 
         ts_node: tree_sitter.Node, 
-        content: str
+        source: bytes
     ) -> ASTNode:
         """
         Convert tree-sitter Node to ASTNode model.
         
+        The tree is walked iteratively with a TreeCursor, which moves through
+        the native tree without materialising a children list per node or
+        recursing in Python.
+        
         Args:
             ts_node: tree-sitter Node
-            content: Original file content
+            source: UTF-8 encoded file content the tree was parsed from
             
         Returns:
             ASTNode model instance
         """
-        # Extract text for the node
-        node_text = content[ts_node.start_byte:ts_node.end_byte]
+        cursor = ts_node.walk()
+        pending_parents: List[tree_sitter.Node] = []
+        child_lists: List[List[ASTNode]] = [[]]
+        
+        while True:
+            node = cursor.node
+            if cursor.goto_first_child():
+                pending_parents.append(node)
+                child_lists.append([])
+                continue
+            
+            child_lists[-1].append(self._build_ast_node(node, source, []))
+            
+            # Close every parent whose last child has just been converted
+            while not cursor.goto_next_sibling():
+                if not pending_parents:
+                    return child_lists[0][0]
+                cursor.goto_parent()
+                children = child_lists.pop()
+                child_lists[-1].append(
+                    self._build_ast_node(pending_parents.pop(), source, children)
+                )
+    
+    def _build_ast_node(
+        self,
+        ts_node: tree_sitter.Node,
+        source: bytes,
+        children: List[ASTNode]
+    ) -> ASTNode:
+        """
+        Build a single ASTNode from a tree-sitter Node and its converted children.
         
-        # Recursively convert children
-        children = [
-            self._convert_to_ast_node(child, content)
-            for child in ts_node.children
-        ]
+        Text is only kept for tokens and for the few composite nodes whose
+        text the plugin reads; copying it for every enclosing class, method
+        and block would duplicate most of the file once per nesting level.
+        
+        Args:
+            ts_node: tree-sitter Node
+            source: UTF-8 encoded file content the tree was parsed from
+            children: Already converted child nodes
+            
+        Returns:
+            ASTNode model instance
+        """
+        # tree-sitter returns a fresh string per call; interning shares one
+        # object per node type and makes type comparisons identity checks
+        node_type = sys.intern(ts_node.type)
+        
+        # Node offsets are byte offsets, so slice the encoded source
+        node_text = None
+        if not children or node_type in _TEXT_NODE_TYPES:
+            node_text = source[ts_node.start_byte:ts_node.end_byte].decode(
+                "utf8", errors="replace"
+            )
         
-        return ASTNode(
-            node_type=ts_node.type,
-            start_line=ts_node.start_point[0] + 1,  # Convert to 1-indexed
-            end_line=ts_node.end_point[0] + 1,
-            start_column=ts_node.start_point[1],
-            end_column=ts_node.end_point[1],
+        start_row, start_column = ts_node.start_point
+        end_row, end_column = ts_node.end_point
+        
+        # Values come straight from tree-sitter, so skip pydantic validation;
+        # this runs once per syntax node and dominates conversion time
+        return ASTNode.model_construct(
+            node_type=node_type,
+            start_line=start_row + 1,  # Convert to 1-indexed
+            end_line=end_row + 1,
+            start_column=start_column,
+            end_column=end_column,
             children=children,
-            text=node_text if len(node_text) < 1000 else node_text[:1000] + "..."
+            text=node_text
         )
     
     async def extract_context(
@@ -169,8 +294,8 @@ class JavaPlugin(LanguagePlugin):
             ast, line_number, "method_declaration"
         )
         
-        # Extract imports
-        imports = self._extract_imports(ast)
+        # Imports and split lines are computed once per file
+        file_context = self._get_file_context(ast, file_content)
         
         # Extract method signature if method found
         method_signature = None
@@ -178,7 +303,9 @@ class JavaPlugin(LanguagePlugin):
             method_signature = self._extract_method_signature(enclosing_method)
         
         # Get surrounding lines
-        surrounding_lines = self._get_surrounding_lines(file_content, line_number, 3)
+        surrounding_lines = self._get_surrounding_lines(
+            file_context["lines"], line_number, 3
+        )
         
         # Extract class name
         class_name = None
@@ -191,10 +318,38 @@ class JavaPlugin(LanguagePlugin):
             line_number=line_number,
             enclosing_class=class_name,
             enclosing_method=method_signature,
-            imports=imports,
+            imports=file_context["imports"],
             surrounding_lines=surrounding_lines
         )
     
+    def _get_file_context(self, ast: ASTNode, file_content: str) -> Dict[str, Any]:
+        """
+        Get file-level context that does not depend on the analyzed line.
+        
+        extract_context is called for every changed line and rule of a file,
+        so the imports and the split file content are cached per AST and
+        reused. The entry is dropped when the AST is garbage collected.
+        
+        Args:
+            ast: Parsed AST of the file
+            file_content: Complete file content
+            
+        Returns:
+            Dictionary with 'imports' and 'lines' entries
+        """
+        cache_key = id(ast)
+        file_context = self._context_cache.get(cache_key)
+        
+        if file_context is None:
+            file_context = {
+                "imports": self._extract_imports(ast),
+                "lines": file_content.split('\n'),
+            }
+            self._context_cache[cache_key] = file_context
+            weakref.finalize(ast, self._context_cache.pop, cache_key, None)
+        
+        return file_context
+    
     def _find_enclosing_node(
         self, 
         ast: ASTNode, 
@@ -204,6 +359,11 @@ class JavaPlugin(LanguagePlugin):
         """
         Find the most specific (innermost) enclosing node of a specific type for a given line.
         
+        Children are ordered by position, so only the children whose spans
+        cover the line are descended into, located with a binary search on
+        start_line. The result matches a full in-order search: the first
+        covering child containing a match wins.
+        
         Args:
             ast: Root AST node
             line_number: Target line number (1-indexed)
@@ -212,23 +372,37 @@ class JavaPlugin(LanguagePlugin):
         Returns:
             ASTNode if found, None otherwise
         """
-        # First, recursively search children to find the most specific match
-        for child in ast.children:
+        if not (ast.start_line <= line_number <= ast.end_line):
+            return None
+        
+        # Children up to the rightmost one starting at or before the line.
+        # Siblings only share boundary lines, so the ones covering the line
+        # are the run ending there, e.g. a method and a trailing "} // end f"
+        children = ast.children
+        end = bisect_right(children, line_number, key=lambda child: child.start_line)
+        start = end
+        while start > 0 and children[start - 1].end_line >= line_number:
+            start -= 1
+        
+        for child in children[start:end]:
             result = self._find_enclosing_node(child, line_number, node_type)
             if result:
                 return result
         
-        # If no child matched, check if current node matches and contains the line
-        if (ast.node_type == node_type and 
-            ast.start_line <= line_number <= ast.end_line):
+        if ast.node_type == node_type:
             return ast
-        
         return None
     
     def _extract_imports(self, ast: ASTNode) -> List[str]:
         """
         Extract import statements from the AST.
         
+        The Java grammar only allows import declarations directly under the
+        program node, so only top-level children are inspected instead of
+        walking the whole tree. Top-level ERROR nodes are searched as well,
+        since tree-sitter may wrap declarations in them when recovering from
+        syntax errors.
+        
         Args:
             ast: Root AST node
             
@@ -236,18 +410,17 @@ class JavaPlugin(LanguagePlugin):
             List of import statement strings
         """
         imports = []
+        stack = list(reversed(ast.children))
         
-        def collect_imports(node: ASTNode):
+        while stack:
+            node = stack.pop()
             if node.node_type == "import_declaration":
                 # Extract the import text
                 if node.text:
                     imports.append(node.text.strip())
-            
-            # Recursively check children
-            for child in node.children:
-                collect_imports(child)
+            elif node.node_type == "ERROR":
+                stack.extend(reversed(node.children))
         
-        collect_imports(ast)
         return imports
     
     def _extract_method_signature(self, method_node: ASTNode) -> Optional[str]:
@@ -301,7 +474,7 @@ class JavaPlugin(LanguagePlugin):
     
     def _get_surrounding_lines(
         self, 
-        content: str, 
+        lines: List[str], 
         line_number: int, 
         context_size: int = 3
     ) -> List[str]:
@@ -309,15 +482,13 @@ class JavaPlugin(LanguagePlugin):
         Get lines surrounding the target line.
         
         Args:
-            content: File content
+            lines: File content split into lines
             line_number: Target line number (1-indexed)
             context_size: Number of lines before and after to include
             
         Returns:
             List of surrounding line strings
         """
-        lines = content.split('\n')
-        
         # Calculate range (convert to 0-indexed)
         start = max(0, line_number - context_size - 1)
         end = min(len(lines), line_number + context_size)
@@ -328,9 +499,24 @@ class JavaPlugin(LanguagePlugin):
         """
         Return Java-specific analysis rules with detailed LLM prompts.
         
+        The rules are built from the configuration on the first call and the
+        same list is returned afterwards; callers must not modify it.
+        
         Returns:
             List of AnalysisRule objects
         """
+        if self._rules_cache is None:
+            self._rules_cache = self._build_analysis_rules()
+        
+        return self._rules_cache
+    
+    def _build_analysis_rules(self) -> List[AnalysisRule]:
+        """
+        Build the configured analysis rules.
+        
+        Returns:
+            List of AnalysisRule objects in configuration order
+        """
         rules = []
         
         # Get rule configurations
@@ -457,36 +643,19 @@ class JavaPlugin(LanguagePlugin):
         Returns:
             List of detected DesignPattern objects
         """
-        patterns = []
+        # Collect the markers of every pattern in a single pass over the tree
+        markers = self._find_pattern_markers(ast, _ALL_PATTERN_MARKERS)
         
-        # Detect Singleton pattern
-        if self._is_singleton_pattern(ast):
-            patterns.append(DesignPattern(
-                pattern_name="Singleton",
-                pattern_type="creational",
+        return [
+            DesignPattern(
+                pattern_name=pattern_name,
+                pattern_type=pattern_type,
                 file_paths=[],  # Will be set by caller
-                description="Singleton pattern detected with private constructor and static instance"
-            ))
-        
-        # Detect Factory pattern
-        if self._is_factory_pattern(ast):
-            patterns.append(DesignPattern(
-                pattern_name="Factory",
-                pattern_type="creational",
-                file_paths=[],
-                description="Factory pattern detected with factory method for object creation"
-            ))
-        
-        # Detect Builder pattern
-        if self._is_builder_pattern(ast):
-            patterns.append(DesignPattern(
-                pattern_name="Builder",
-                pattern_type="creational",
-                file_paths=[],
-                description="Builder pattern detected with fluent interface for object construction"
-            ))
-        
-        return patterns
+                description=description
+            )
+            for pattern_name, pattern_type, required, description in _PATTERN_DEFINITIONS
+            if required <= markers
+        ]
     
     def _is_singleton_pattern(self, ast: ASTNode) -> bool:
         """
@@ -497,34 +666,7 @@ class JavaPlugin(LanguagePlugin):
         - Private constructor
         - Public static getInstance() method
         """
-        has_private_static_instance = False
-        has_private_constructor = False
-        has_get_instance = False
-        
-        def check_node(node: ASTNode):
-            nonlocal has_private_static_instance, has_private_constructor, has_get_instance
-            
-            # Check for private static field
-            if node.node_type == "field_declaration":
-                if node.text and "private" in node.text and "static" in node.text:
-                    has_private_static_instance = True
-            
-            # Check for private constructor
-            if node.node_type == "constructor_declaration":
-                if node.text and "private" in node.text:
-                    has_private_constructor = True
-            
-            # Check for getInstance method
-            if node.node_type == "method_declaration":
-                if node.text and "getInstance" in node.text and "static" in node.text:
-                    has_get_instance = True
-            
-            for child in node.children:
-                check_node(child)
-        
-        check_node(ast)
-        
-        return has_private_static_instance and has_private_constructor and has_get_instance
+        return _SINGLETON_MARKERS <= self._find_pattern_markers(ast, _SINGLETON_MARKERS)
     
     def _is_factory_pattern(self, ast: ASTNode) -> bool:
         """
@@ -534,20 +676,7 @@ class JavaPlugin(LanguagePlugin):
         - Method name containing "create" or "factory"
         - Returns an interface or abstract class type
         """
-        def check_node(node: ASTNode) -> bool:
-            if node.node_type == "method_declaration":
-                if node.text:
-                    text_lower = node.text.lower()
-                    if "create" in text_lower or "factory" in text_lower:
-                        return True
-            
-            for child in node.children:
-                if check_node(child):
-                    return True
-            
-            return False
-        
-        return check_node(ast)
+        return _FACTORY_MARKERS <= self._find_pattern_markers(ast, _FACTORY_MARKERS)
     
     def _is_builder_pattern(self, ast: ASTNode) -> bool:
         """
@@ -558,25 +687,89 @@ class JavaPlugin(LanguagePlugin):
         - Methods that return 'this' (fluent interface)
         - build() method
         """
-        has_builder_class = False
-        has_build_method = False
+        return _BUILDER_MARKERS <= self._find_pattern_markers(ast, _BUILDER_MARKERS)
+    
+    def _find_pattern_markers(self, ast: ASTNode, wanted: FrozenSet[str]) -> Set[str]:
+        """
+        Collect the structural markers of design patterns present in the AST.
         
-        def check_node(node: ASTNode):
-            nonlocal has_builder_class, has_build_method
+        All declaration checks are dispatched from one iterative walk, which
+        stops as soon as every wanted marker has been found.
+        
+        Args:
+            ast: Root AST node
+            wanted: Markers the caller needs (see the *_MARKERS constants)
             
-            # Check for Builder class
-            if node.node_type == "class_declaration":
-                if node.text and "Builder" in node.text:
-                    has_builder_class = True
+        Returns:
+            Set of markers found, e.g. {'private_constructor', 'build_method'}
+        """
+        markers: Set[str] = set()
+        stack = [ast]
+        
+        while stack and not wanted <= markers:
+            node = stack.pop()
+            node_type = node.node_type
             
-            # Check for build method
-            if node.node_type == "method_declaration":
-                if node.text and "build()" in node.text:
-                    has_build_method = True
+            if node_type == "method_declaration":
+                method_name = self._get_identifier(node)
+                if method_name:
+                    if (method_name == "getInstance" and
+                            "static" in self._get_modifiers(node)):
+                        markers.add("static_get_instance")
+                    
+                    if method_name == "build":
+                        markers.add("build_method")
+                    
+                    if "factory_method" not in markers:
+                        name_lower = method_name.lower()
+                        if "create" in name_lower or "factory" in name_lower:
+                            markers.add("factory_method")
             
-            for child in node.children:
-                check_node(child)
+            elif node_type == "field_declaration":
+                if _PRIVATE_STATIC <= self._get_modifiers(node):
+                    markers.add("private_static_field")
+            
+            elif node_type == "constructor_declaration":
+                if "private" in self._get_modifiers(node):
+                    markers.add("private_constructor")
+            
+            elif node_type == "class_declaration":
+                class_name = self._get_identifier(node)
+                if class_name and "Builder" in class_name:
+                    markers.add("builder_class")
+            
+            stack.extend(node.children)
         
-        check_node(ast)
+        return markers
+    
+    def _get_modifiers(self, node: ASTNode) -> Set[str]:
+        """
+        Get the modifier keywords of a declaration node.
         
-        return has_builder_class and has_build_method
+        Args:
+            node: Declaration AST node (class, field, method, constructor)
+            
+        Returns:
+            Set of modifier node types, e.g. {'private', 'static'}
+        """
+        for child in node.children:
+            if child.node_type == "modifiers":
+                return {modifier.node_type for modifier in child.children}
+        
+        return set()
+    
+    def _get_identifier(self, node: ASTNode) -> Optional[str]:
+        """
+        Get the declared name of a declaration node.
+        
+        Args:
+            node: Declaration AST node (class, method, constructor)
+            
+        Returns:
+            Name of the declaration or None
+        """
+        for child in node.children:
+            if child.node_type == "identifier":
+                return child.text
+        
+        return None
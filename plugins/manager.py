@@ -4,15 +4,27 @@ Plugin Manager for language-specific analysis plugins.
 This module manages plugin registration, discovery, and selection based on file extensions.
 """
 
+import asyncio
 import logging
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 import yaml
 
 from plugins.base import LanguagePlugin
 
+# Prefer the libyaml C loader when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
 logger = logging.getLogger(__name__)
 
+# Maximum number of plugin configurations kept in memory
+_CONFIG_CACHE_SIZE = 128
+
 
 class PluginManager:
     """Manages language plugin registration and selection."""
@@ -20,8 +32,12 @@ class PluginManager:
     def __init__(self):
         """Initialize the plugin manager."""
         self._plugins: Dict[str, LanguagePlugin] = {}
-        self._extension_map: Dict[str, str] = {}
-        self._config_cache: Dict[str, Dict] = {}
+        # Extension -> plugin, so file lookups resolve in a single dict access
+        self._extension_map: Dict[str, LanguagePlugin] = {}
+        # LRU of (config path, mtime_ns, size) -> config; the stat fields let
+        # edited configs reload
+        self._config_cache: "OrderedDict[Tuple[str, int, int], Dict]" = OrderedDict()
+        self._config_cache_lock = threading.Lock()
     
     def register_plugin(self, plugin: LanguagePlugin) -> None:
         """
@@ -34,17 +50,21 @@ class PluginManager:
         
         if language_name in self._plugins:
             logger.warning(f"Plugin for language '{language_name}' already registered, overwriting")
+            self._remove_extensions(self._plugins[language_name])
         
         self._plugins[language_name] = plugin
         
-        # Map file extensions to language
+        # Map file extensions to the plugin; keys are lowercased so lookups
+        # are case-insensitive
         for ext in plugin.file_extensions:
+            ext = ext.lower()
             if ext in self._extension_map:
                 logger.warning(
-                    f"Extension '{ext}' already mapped to '{self._extension_map[ext]}', "
+                    f"Extension '{ext}' already mapped to "
+                    f"'{self._extension_map[ext].language_name}', "
                     f"overwriting with '{language_name}'"
                 )
-            self._extension_map[ext] = language_name
+            self._extension_map[ext] = plugin
         
         logger.info(
             f"Registered plugin for language '{language_name}' "
@@ -61,13 +81,21 @@ class PluginManager:
         Returns:
             LanguagePlugin instance if found, None otherwise
         """
-        ext = Path(file_path).suffix
-        language = self._extension_map.get(ext)
+        # Equivalent to Path(file_path).suffix without building a path object,
+        # as this runs for every file in a pull request
+        dot_index = file_path.rfind('.')
+        if dot_index > file_path.rfind('/') + 1:
+            ext = file_path[dot_index:].lower()
+        else:
+            ext = ''
+        
+        plugin = self._extension_map.get(ext)
         
-        if language:
-            return self._plugins.get(language)
+        if plugin is not None:
+            return plugin
         
-        logger.debug(f"No plugin found for file extension '{ext}' (file: {file_path})")
+        # Lazy formatting: unsupported files are common and debug is usually off
+        logger.debug("No plugin found for file extension '%s' (file: %s)", ext, file_path)
         return None
     
     def get_plugin(self, language_name: str) -> Optional[LanguagePlugin]:
@@ -116,17 +144,23 @@ class PluginManager:
         """
         config_path = plugin_dir / "config.yaml"
         
-        # Check cache first
-        cache_key = str(config_path)
-        if cache_key in self._config_cache:
-            return self._config_cache[cache_key]
-        
-        if not config_path.exists():
+        try:
+            stat = config_path.stat()
+        except FileNotFoundError:
             raise FileNotFoundError(f"Plugin configuration not found: {config_path}")
         
+        # Check cache first; an edited file has a new mtime or size and so
+        # misses, even on filesystems with coarse timestamps
+        cache_key = (str(config_path), stat.st_mtime_ns, stat.st_size)
+        with self._config_cache_lock:
+            cached = self._config_cache.get(cache_key)
+            if cached is not None:
+                self._config_cache.move_to_end(cache_key)
+                return cached
+        
         try:
             with open(config_path, 'r') as f:
-                config = yaml.safe_load(f)
+                config = yaml.load(f, Loader=SafeLoader)
             
             # Validate required fields
             required_fields = ['name', 'version', 'file_extensions']
@@ -134,8 +168,11 @@ class PluginManager:
                 if field not in config:
                     raise ValueError(f"Missing required field '{field}' in {config_path}")
             
-            # Cache the configuration
-            self._config_cache[cache_key] = config
+            # Cache the configuration, evicting the least recently used entry
+            with self._config_cache_lock:
+                self._config_cache[cache_key] = config
+                if len(self._config_cache) > _CONFIG_CACHE_SIZE:
+                    self._config_cache.popitem(last=False)
             
             logger.info(f"Loaded plugin configuration from {config_path}")
             return config
@@ -161,6 +198,7 @@ class PluginManager:
         logger.info(f"Initializing plugins from {plugins_dir}")
         
         # Scan for plugin directories
+        plugin_dirs = []
         for plugin_dir in plugins_dir.iterdir():
             if not plugin_dir.is_dir():
                 continue
@@ -170,17 +208,24 @@ class PluginManager:
                 logger.debug(f"Skipping {plugin_dir.name}: no config.yaml found")
                 continue
             
-            try:
-                config = self.load_plugin_config(plugin_dir)
-                logger.info(
-                    f"Found plugin configuration: {config['name']} v{config['version']}"
-                )
-                # Note: Actual plugin instantiation will be done by specific plugin modules
-                # This method just discovers and validates configurations
-                
-            except Exception as e:
-                logger.error(f"Failed to load plugin from {plugin_dir}: {e}")
+            plugin_dirs.append(plugin_dir)
+        
+        # Load configurations concurrently; file IO and YAML parsing are blocking
+        results = await asyncio.gather(
+            *(asyncio.to_thread(self.load_plugin_config, plugin_dir) for plugin_dir in plugin_dirs),
+            return_exceptions=True
+        )
+        
+        for plugin_dir, result in zip(plugin_dirs, results):
+            if isinstance(result, Exception):
+                logger.error(f"Failed to load plugin from {plugin_dir}: {result}")
                 continue
+            
+            logger.info(
+                f"Found plugin configuration: {result['name']} v{result['version']}"
+            )
+            # Note: Actual plugin instantiation will be done by specific plugin modules
+            # This method just discovers and validates configurations
     
     def unregister_plugin(self, language_name: str) -> bool:
         """
@@ -195,19 +240,24 @@ class PluginManager:
         if language_name not in self._plugins:
             return False
         
-        plugin = self._plugins[language_name]
-        
-        # Remove extension mappings
-        for ext in plugin.file_extensions:
-            if self._extension_map.get(ext) == language_name:
-                del self._extension_map[ext]
-        
-        # Remove plugin
-        del self._plugins[language_name]
+        # Remove extension mappings and plugin
+        self._remove_extensions(self._plugins.pop(language_name))
         
         logger.info(f"Unregistered plugin for language '{language_name}'")
         return True
     
+    def _remove_extensions(self, plugin: LanguagePlugin) -> None:
+        """
+        Remove the extension mappings that still point to a plugin.
+        
+        Args:
+            plugin: Plugin whose extensions should be unmapped
+        """
+        for ext in plugin.file_extensions:
+            ext = ext.lower()
+            if self._extension_map.get(ext) is plugin:
+                del self._extension_map[ext]
+    
     def get_statistics(self) -> Dict[str, int]:
         """
         Get plugin manager statistics.
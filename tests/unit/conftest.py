@@ -0,0 +1,48 @@
+"""
+Shared fixtures for unit tests.
+"""
+
+import os
+import pickle
+import pytest
+from pathlib import Path
+
+
+# Resolved once so the tests do not depend on the working directory
+_JAVA_CONFIG_PATH = Path(__file__).resolve().parents[2] / "plugins" / "java" / "config.yaml"
+
+
+@pytest.fixture(scope="session")
+def java_plugin():
+    """Create a Java plugin instance shared by all Java plugin tests."""
+    from plugins.java.plugin import JavaPlugin
+    
+    return JavaPlugin(config_path=_JAVA_CONFIG_PATH)
+
+
+@pytest.fixture(scope="session")
+async def java_plugin_rules(request, tmp_path_factory):
+    """
+    Java analysis rules, built once per test run.
+    
+    Under pytest-xdist every worker has its own session, so the first worker
+    to need the rules pickles them into the run's shared temp directory and
+    the others load that file instead of building a plugin. The file is
+    written under a temporary name and moved into place atomically; two
+    workers racing only means both build it, so no lock is needed.
+    """
+    cache_file = None
+    if "PYTEST_XDIST_WORKER" in os.environ:
+        cache_file = tmp_path_factory.getbasetemp().parent / "java_rules.pkl"
+        if cache_file.exists():
+            return pickle.loads(cache_file.read_bytes())
+    
+    java_plugin = request.getfixturevalue("java_plugin")
+    rules = await java_plugin.get_analysis_rules()
+    
+    if cache_file is not None:
+        partial_file = cache_file.with_name(f"{cache_file.name}.{os.getpid()}")
+        partial_file.write_bytes(pickle.dumps(rules))
+        os.replace(partial_file, cache_file)
+    
+    return rules
@@ -8,18 +8,26 @@ Tests the core functionality of the Angular plugin including:
 - Decorator detection
 """
 
+import asyncio
+import functools
+import weakref
+
 import pytest
 from pathlib import Path
 from plugins.angular.plugin import AngularPlugin
 
 
-@pytest.fixture
+# Parsed ASTs are reused from the on-disk cache in tests/conftest.py
+pytestmark = pytest.mark.usefixtures("cached_parse")
+
+
+@pytest.fixture(scope="session")
 def angular_plugin():
     """Create an Angular plugin instance."""
     return AngularPlugin()
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_angular_component():
     """Sample Angular component code."""
     return """
@@ -48,7 +56,7 @@ export class TestComponent implements OnInit {
 """
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_angular_service():
     """Sample Angular service code."""
     return """
@@ -71,6 +79,43 @@ export class DataService {
 """
 
 
+@pytest.fixture(scope="session")
+async def parsed_component_ast(angular_plugin, sample_angular_component):
+    """Parse the sample component once for all tests."""
+    return await angular_plugin.parse_file("test.component.ts", sample_angular_component)
+
+
+@pytest.fixture(scope="session")
+async def parsed_service_ast(angular_plugin, sample_angular_service):
+    """Parse the sample service once for all tests."""
+    return await angular_plugin.parse_file("data.service.ts", sample_angular_service)
+
+
+def _memoize_by_ast(method):
+    """Wrap an AST-walking helper so each (AST, args) pair is walked once."""
+    results = {}
+    
+    @functools.wraps(method)
+    def wrapper(self, ast, *args):
+        key = (id(ast), args)
+        if key not in results:
+            results[key] = method(self, ast, *args)
+            # ASTNode is unhashable, so entries are keyed by id and dropped with the AST
+            weakref.finalize(ast, results.pop, key, None)
+        return results[key]
+    
+    return wrapper
+
+
+@pytest.fixture(scope="module", autouse=True)
+def memoized_ast_helpers():
+    """Memoize the plugin's AST walks over the shared parsed samples."""
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        for name in ("_has_decorator", "_uses_observables", "_extract_imports"):
+            monkeypatch.setattr(AngularPlugin, name, _memoize_by_ast(getattr(AngularPlugin, name)))
+        yield
+
+
 class TestAngularPluginBasic:
     """Test basic Angular plugin functionality."""
     
@@ -81,31 +126,22 @@ class TestAngularPluginBasic:
         assert ".component.ts" in angular_plugin.file_extensions
         assert ".service.ts" in angular_plugin.file_extensions
     
-    @pytest.mark.asyncio
-    async def test_parse_component_file(self, angular_plugin, sample_angular_component):
+    async def test_parse_component_file(self, angular_plugin, parsed_component_ast):
         """Test parsing an Angular component file."""
-        ast = await angular_plugin.parse_file("test.component.ts", sample_angular_component)
-        
-        assert ast is not None
-        assert ast.node_type == "program"
-        assert len(ast.children) > 0
+        assert parsed_component_ast is not None
+        assert parsed_component_ast.node_type == "program"
+        assert len(parsed_component_ast.children) > 0
     
-    @pytest.mark.asyncio
-    async def test_parse_service_file(self, angular_plugin, sample_angular_service):
+    async def test_parse_service_file(self, angular_plugin, parsed_service_ast):
         """Test parsing an Angular service file."""
-        ast = await angular_plugin.parse_file("data.service.ts", sample_angular_service)
-        
-        assert ast is not None
-        assert ast.node_type == "program"
-        assert len(ast.children) > 0
+        assert parsed_service_ast is not None
+        assert parsed_service_ast.node_type == "program"
+        assert len(parsed_service_ast.children) > 0
     
-    @pytest.mark.asyncio
-    async def test_extract_context_from_component(self, angular_plugin, sample_angular_component):
+    async def test_extract_context_from_component(self, angular_plugin, sample_angular_component, parsed_component_ast):
         """Test extracting context from a component method."""
-        ast = await angular_plugin.parse_file("test.component.ts", sample_angular_component)
-        
         # Extract context for line in ngOnInit method (around line 15)
-        context = await angular_plugin.extract_context(15, ast, sample_angular_component)
+        context = await angular_plugin.extract_context(15, parsed_component_ast, sample_angular_component)
         
         assert context.language == "angular"
         assert context.line_number == 15
@@ -113,34 +149,24 @@ class TestAngularPluginBasic:
         assert len(context.imports) > 0
         assert len(context.surrounding_lines) > 0
     
-    @pytest.mark.asyncio
-    async def test_detect_component_decorator(self, angular_plugin, sample_angular_component):
+    async def test_detect_component_decorator(self, angular_plugin, parsed_component_ast):
         """Test detecting @Component decorator."""
-        ast = await angular_plugin.parse_file("test.component.ts", sample_angular_component)
-        
         # Check if Component decorator is detected
-        has_component = angular_plugin._has_decorator(ast, "Component")
+        has_component = angular_plugin._has_decorator(parsed_component_ast, "Component")
         assert has_component is True
     
-    @pytest.mark.asyncio
-    async def test_detect_injectable_decorator(self, angular_plugin, sample_angular_service):
+    async def test_detect_injectable_decorator(self, angular_plugin, parsed_service_ast):
         """Test detecting @Injectable decorator."""
-        ast = await angular_plugin.parse_file("data.service.ts", sample_angular_service)
-        
         # Check if Injectable decorator is detected
-        has_injectable = angular_plugin._has_decorator(ast, "Injectable")
+        has_injectable = angular_plugin._has_decorator(parsed_service_ast, "Injectable")
         assert has_injectable is True
     
-    @pytest.mark.asyncio
-    async def test_detect_observable_usage(self, angular_plugin, sample_angular_service):
+    async def test_detect_observable_usage(self, angular_plugin, parsed_service_ast):
         """Test detecting Observable usage."""
-        ast = await angular_plugin.parse_file("data.service.ts", sample_angular_service)
-        
         # Check if Observable usage is detected
-        uses_observables = angular_plugin._uses_observables(ast)
+        uses_observables = angular_plugin._uses_observables(parsed_service_ast)
         assert uses_observables is True
     
-    @pytest.mark.asyncio
     async def test_get_analysis_rules(self, angular_plugin):
         """Test getting Angular-specific analysis rules."""
         rules = await angular_plugin.get_analysis_rules()
@@ -153,51 +179,77 @@ class TestAngularPluginBasic:
         assert "dependency_injection" in rule_names
         assert "rxjs_best_practices" in rule_names
     
-    @pytest.mark.asyncio
-    async def test_detect_patterns_component(self, angular_plugin, sample_angular_component):
+    async def test_detect_patterns_component(self, angular_plugin, parsed_component_ast):
         """Test detecting Angular component pattern."""
-        ast = await angular_plugin.parse_file("test.component.ts", sample_angular_component)
-        
-        patterns = await angular_plugin.detect_patterns(ast)
+        patterns = await angular_plugin.detect_patterns(parsed_component_ast)
         
         assert len(patterns) > 0
         pattern_names = [p.pattern_name for p in patterns]
         assert "Component" in pattern_names
         assert "Observable" in pattern_names
     
-    @pytest.mark.asyncio
-    async def test_detect_patterns_service(self, angular_plugin, sample_angular_service):
+    async def test_detect_patterns_service(self, angular_plugin, parsed_service_ast):
         """Test detecting Angular service pattern."""
-        ast = await angular_plugin.parse_file("data.service.ts", sample_angular_service)
-        
-        patterns = await angular_plugin.detect_patterns(ast)
+        patterns = await angular_plugin.detect_patterns(parsed_service_ast)
         
         assert len(patterns) > 0
         pattern_names = [p.pattern_name for p in patterns]
         assert "Service" in pattern_names
         assert "Observable" in pattern_names
     
-    @pytest.mark.asyncio
-    async def test_extract_imports(self, angular_plugin, sample_angular_component):
+    async def test_extract_imports(self, angular_plugin, parsed_component_ast):
         """Test extracting import statements."""
-        ast = await angular_plugin.parse_file("test.component.ts", sample_angular_component)
-        
-        imports = angular_plugin._extract_imports(ast)
+        imports = angular_plugin._extract_imports(parsed_component_ast)
         
         assert len(imports) > 0
         # Check that imports contain expected modules
         import_text = " ".join(imports)
         assert "@angular/core" in import_text or "Component" in import_text
     
-    @pytest.mark.asyncio
-    async def test_extract_class_name(self, angular_plugin, sample_angular_component):
+    async def test_extract_class_name(self, angular_plugin, parsed_component_ast):
         """Test extracting class name from AST."""
-        ast = await angular_plugin.parse_file("test.component.ts", sample_angular_component)
-        
         # Find the class declaration
-        class_node = angular_plugin._find_enclosing_node(ast, 10, "class_declaration")
+        class_node = angular_plugin._find_enclosing_node(parsed_component_ast, 10, "class_declaration")
         
         assert class_node is not None
         
         class_name = angular_plugin._extract_class_name(class_node)
         assert class_name == "TestComponent"
+    
+    async def test_extract_context_reuses_file_context(self, angular_plugin, sample_angular_component, parsed_component_ast):
+        """Test that imports and split lines are shared across lines of one file."""
+        first = await angular_plugin.extract_context(15, parsed_component_ast, sample_angular_component)
+        second = await angular_plugin.extract_context(19, parsed_component_ast, sample_angular_component)
+        
+        assert first.imports == second.imports
+        assert angular_plugin._get_file_context(parsed_component_ast, sample_angular_component) is \
+            angular_plugin._get_file_context(parsed_component_ast, sample_angular_component)
+        assert second.surrounding_lines == sample_angular_component.split("\n")[15:22]
+    
+    async def test_extract_context_for_many_lines(self, angular_plugin, sample_angular_component, parsed_component_ast):
+        """Test that contexts for independent lines can be extracted concurrently."""
+        lines = [12, 15, 17, 20]
+        
+        contexts = await asyncio.gather(*(
+            angular_plugin.extract_context(line, parsed_component_ast, sample_angular_component)
+            for line in lines
+        ))
+        
+        assert [context.line_number for context in contexts] == lines
+        assert all(context.enclosing_class == "TestComponent" for context in contexts)
+    
+    async def test_extract_context_on_closing_line_with_trailing_comment(self, angular_plugin):
+        """Test that a comment after a method's closing brace does not hide the method."""
+        source = (
+            "export class CounterComponent {\n"
+            "  count(): number {\n"
+            "    return 1;\n"
+            "  } // end count\n"
+            "}\n"
+        )
+        ast = await angular_plugin.parse_file("counter.component.ts", source)
+        
+        context = await angular_plugin.extract_context(4, ast, source)
+        
+        assert context.enclosing_class == "CounterComponent"
+        assert context.enclosing_method == "count()"
@@ -9,15 +9,17 @@ from datetime import datetime
 # Skip tests if fastapi is not installed
 pytest.importorskip("fastapi")
 
-from fastapi.testclient import TestClient
-from app.main import app
 from app.config import settings
 from app.models.agent import AgentInfo, AgentStatus
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def client():
     """Create test client."""
+    # Imported here so collecting this module does not build the whole app
+    from fastapi.testclient import TestClient
+    from app.main import app
+    
     return TestClient(app)
 
 
@@ -28,7 +30,7 @@ def mock_orchestrator():
         yield mock
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def api_headers():
     """API headers with valid API key."""
     api_key = getattr(settings, 'admin_api_key', settings.webhook_secret)
@@ -59,9 +61,10 @@ def test_list_agents_success(client, mock_orchestrator, api_headers):
     response = client.get("/api/agents", headers=api_headers)
     
     assert response.status_code == 200
-    assert len(response.json()) == 1
-    assert response.json()[0]["agent_id"] == "agent-1"
-    assert response.json()[0]["status"] == "running"
+    data = response.json()
+    assert len(data) == 1
+    assert data[0]["agent_id"] == "agent-1"
+    assert data[0]["status"] == "running"
 
 
 def test_get_agent_status_requires_auth(client):
@@ -86,8 +89,9 @@ def test_get_agent_status_success(client, mock_orchestrator, api_headers):
     response = client.get("/api/agents/agent-1", headers=api_headers)
     
     assert response.status_code == 200
-    assert response.json()["agent_id"] == "agent-1"
-    assert response.json()["pr_id"] == "123"
+    data = response.json()
+    assert data["agent_id"] == "agent-1"
+    assert data["pr_id"] == "123"
 
 
 def test_get_agent_status_not_found(client, mock_orchestrator, api_headers):
@@ -9,15 +9,17 @@ from datetime import datetime
 # Skip tests if fastapi is not installed
 pytest.importorskip("fastapi")
 
-from fastapi.testclient import TestClient
-from app.main import app
 from app.config import settings
 from app.models.repository import Repository
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def client():
     """Create test client."""
+    # Imported here so collecting this module does not build the whole app
+    from fastapi.testclient import TestClient
+    from app.main import app
+    
     return TestClient(app)
 
 
@@ -28,7 +30,7 @@ def mock_repo_service():
         yield mock
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def api_headers():
     """API headers with valid API key."""
     api_key = getattr(settings, 'admin_api_key', settings.webhook_secret)
@@ -61,8 +63,9 @@ def test_list_repositories_success(client, mock_repo_service, api_headers):
     response = client.get("/api/repositories", headers=api_headers)
     
     assert response.status_code == 200
-    assert len(response.json()) == 1
-    assert response.json()[0]["repository_name"] == "repo1"
+    data = response.json()
+    assert len(data) == 1
+    assert data[0]["repository_name"] == "repo1"
 
 
 def test_add_repository_requires_auth(client):
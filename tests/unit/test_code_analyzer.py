@@ -16,19 +16,41 @@ from app.models import (
     CodeContext,
     AnalysisRule,
 )
-from plugins.manager import PluginManager
+
+
+# Shared read-only inputs for the analyze_line tests
+_DEFAULT_AST = ASTNode(
+    node_type="program",
+    start_line=1,
+    end_line=10,
+    start_column=0,
+    end_column=0,
+)
+_DEFAULT_RULE = AnalysisRule(
+    name="test_rule",
+    category=CommentCategory.BUG,
+    severity=CommentSeverity.WARNING,
+    pattern="Test pattern",
+    llm_prompt="Check for issues",
+)
+
+
+class _FakePluginManager:
+    """Stand-in for PluginManager exposing only what CodeAnalyzer calls."""
+    
+    def __init__(self):
+        self.get_plugin_for_file = MagicMock(return_value=None)
 
 
 @pytest.fixture
 def mock_plugin_manager():
     """Create a mock plugin manager."""
-    manager = MagicMock(spec=PluginManager)
-    return manager
+    return _FakePluginManager()
 
 
-@pytest.fixture
+@pytest.fixture(scope="class")
 def mock_plugin():
-    """Create a mock language plugin."""
+    """Create a mock language plugin shared by the tests of a class."""
     plugin = AsyncMock()
     plugin.language_name = "java"
     plugin.file_extensions = [".java"]
@@ -68,6 +90,23 @@ def mock_plugin():
     return plugin
 
 
+@pytest.fixture
+def openai_settings():
+    """Create settings that select the OpenAI (non-Azure) client."""
+    settings = MagicMock()
+    settings.azure_openai_endpoint = None
+    settings.azure_openai_api_key = None
+    settings.openai_api_key = "test-key"
+    return settings
+
+
+@pytest.fixture
+def llm_client_openai(openai_settings):
+    """Create an LLMClient backed by a patched AsyncOpenAI client."""
+    with patch('app.analyzers.code_analyzer.AsyncOpenAI'):
+        yield LLMClient(settings=openai_settings)
+
+
 @pytest.fixture
 def code_analyzer(mock_plugin_manager):
     """Create a CodeAnalyzer instance with mock LLM client."""
@@ -98,17 +137,10 @@ def sample_file_change():
 class TestLLMClient:
     """Tests for LLMClient."""
     
-    def test_init_openai(self):
+    def test_init_openai(self, llm_client_openai):
         """Test LLMClient initialization with OpenAI."""
-        mock_settings = MagicMock()
-        mock_settings.azure_openai_endpoint = None
-        mock_settings.azure_openai_api_key = None
-        mock_settings.openai_api_key = "test-key"
-        
-        with patch('app.analyzers.code_analyzer.AsyncOpenAI'):
-            client = LLMClient(settings=mock_settings)
-            assert not client.is_azure
-            assert client.deployment == "gpt-4"
+        assert not llm_client_openai.is_azure
+        assert llm_client_openai.deployment == "gpt-4"
     
     def test_init_azure_openai(self):
         """Test LLMClient initialization with Azure OpenAI."""
@@ -122,79 +154,60 @@ class TestLLMClient:
             assert client.is_azure
             assert client.deployment == "gpt-4-deployment"
     
-    @pytest.mark.asyncio
-    async def test_analyze_code_no_issue(self):
+    async def test_analyze_code_no_issue(self, llm_client_openai):
         """Test analyze_code when no issue is found."""
-        mock_settings = MagicMock()
-        mock_settings.azure_openai_endpoint = None
-        mock_settings.azure_openai_api_key = None
-        mock_settings.openai_api_key = "test-key"
+        # Mock the API response
+        mock_response = MagicMock()
+        mock_response.choices = [MagicMock()]
+        mock_response.choices[0].message.content = "No issue found."
         
-        with patch('app.analyzers.code_analyzer.AsyncOpenAI'):
-            client = LLMClient(settings=mock_settings)
-            
-            # Mock the API response
-            mock_response = MagicMock()
-            mock_response.choices = [MagicMock()]
-            mock_response.choices[0].message.content = "No issue found."
-            
-            client.client.chat.completions.create = AsyncMock(return_value=mock_response)
-            
-            context = CodeContext(
-                language="java",
-                file_path="Test.java",
-                line_number=5,
-            )
-            rule = AnalysisRule(
-                name="test_rule",
-                category=CommentCategory.BUG,
-                severity=CommentSeverity.WARNING,
-                pattern="Test pattern",
-                llm_prompt="Check for issues",
-            )
-            
-            result = await client.analyze_code("String name = null;", context, rule)
-            assert result is None
+        llm_client_openai.client.chat.completions.create = AsyncMock(return_value=mock_response)
+        
+        context = CodeContext(
+            language="java",
+            file_path="Test.java",
+            line_number=5,
+        )
+        rule = AnalysisRule(
+            name="test_rule",
+            category=CommentCategory.BUG,
+            severity=CommentSeverity.WARNING,
+            pattern="Test pattern",
+            llm_prompt="Check for issues",
+        )
+        
+        result = await llm_client_openai.analyze_code("String name = null;", context, rule)
+        assert result is None
     
-    @pytest.mark.asyncio
-    async def test_analyze_code_with_issue(self):
+    async def test_analyze_code_with_issue(self, llm_client_openai):
         """Test analyze_code when an issue is found."""
-        mock_settings = MagicMock()
-        mock_settings.azure_openai_endpoint = None
-        mock_settings.azure_openai_api_key = None
-        mock_settings.openai_api_key = "test-key"
+        # Mock the API response
+        mock_response = MagicMock()
+        mock_response.choices = [MagicMock()]
+        mock_response.choices[0].message.content = "Potential null pointer issue detected."
         
-        with patch('app.analyzers.code_analyzer.AsyncOpenAI'):
-            client = LLMClient(settings=mock_settings)
-            
-            # Mock the API response
-            mock_response = MagicMock()
-            mock_response.choices = [MagicMock()]
-            mock_response.choices[0].message.content = "Potential null pointer issue detected."
-            
-            client.client.chat.completions.create = AsyncMock(return_value=mock_response)
-            
-            context = CodeContext(
-                language="java",
-                file_path="Test.java",
-                line_number=5,
-            )
-            rule = AnalysisRule(
-                name="test_rule",
-                category=CommentCategory.BUG,
-                severity=CommentSeverity.WARNING,
-                pattern="Test pattern",
-                llm_prompt="Check for issues",
-            )
-            
-            result = await client.analyze_code("String name = null;", context, rule)
-            assert result == "Potential null pointer issue detected."
+        llm_client_openai.client.chat.completions.create = AsyncMock(return_value=mock_response)
+        
+        context = CodeContext(
+            language="java",
+            file_path="Test.java",
+            line_number=5,
+        )
+        rule = AnalysisRule(
+            name="test_rule",
+            category=CommentCategory.BUG,
+            severity=CommentSeverity.WARNING,
+            pattern="Test pattern",
+            llm_prompt="Check for issues",
+        )
+        
+        result = await llm_client_openai.analyze_code("String name = null;", context, rule)
+        assert result == "Potential null pointer issue detected."
 
 
 class TestCodeAnalyzer:
     """Tests for CodeAnalyzer."""
     
-    @pytest.mark.asyncio
     async def test_analyze_file_no_plugin(self, code_analyzer, sample_file_change):
         """Test analyze_file when no plugin is found."""
         code_analyzer.plugin_manager.get_plugin_for_file = MagicMock(return_value=None)
@@ -202,7 +215,6 @@ class TestCodeAnalyzer:
         comments = await code_analyzer.analyze_file(sample_file_change)
         assert comments == []
     
-    @pytest.mark.asyncio
     async def test_analyze_file_deleted_file(self, code_analyzer, mock_plugin):
         """Test analyze_file skips deleted files."""
         code_analyzer.plugin_manager.get_plugin_for_file = MagicMock(return_value=mock_plugin)
@@ -218,16 +230,14 @@ class TestCodeAnalyzer:
         comments = await code_analyzer.analyze_file(deleted_file)
         assert comments == []
     
-    @pytest.mark.asyncio
-    async def test_analyze_file_parse_failure(self, code_analyzer, mock_plugin, sample_file_change):
+    async def test_analyze_file_parse_failure(self, code_analyzer, mock_plugin, sample_file_change, monkeypatch):
         """Test analyze_file handles parse failures gracefully."""
         code_analyzer.plugin_manager.get_plugin_for_file = MagicMock(return_value=mock_plugin)
-        mock_plugin.parse_file = AsyncMock(side_effect=Exception("Parse error"))
+        monkeypatch.setattr(mock_plugin, "parse_file", AsyncMock(side_effect=Exception("Parse error")))
         
         comments = await code_analyzer.analyze_file(sample_file_change)
         assert comments == []
     
-    @pytest.mark.asyncio
     async def test_analyze_file_success(self, code_analyzer, mock_plugin, sample_file_change):
         """Test successful file analysis."""
         code_analyzer.plugin_manager.get_plugin_for_file = MagicMock(return_value=mock_plugin)
@@ -246,7 +256,6 @@ class TestCodeAnalyzer:
         assert comments[0].severity == CommentSeverity.WARNING
         assert comments[0].category == CommentCategory.BUG
     
-    @pytest.mark.asyncio
     async def test_parse_file_no_plugin(self, code_analyzer):
         """Test parse_file raises error when no plugin found."""
         code_analyzer.plugin_manager.get_plugin_for_file = MagicMock(return_value=None)
@@ -254,7 +263,6 @@ class TestCodeAnalyzer:
         with pytest.raises(ValueError, match="No plugin found"):
             await code_analyzer.parse_file("Test.java", "content")
     
-    @pytest.mark.asyncio
     async def test_parse_file_success(self, code_analyzer, mock_plugin):
         """Test successful file parsing."""
         ast = await code_analyzer.parse_file("Test.java", "content", mock_plugin)
@@ -262,55 +270,23 @@ class TestCodeAnalyzer:
         assert ast is not None
         assert ast.node_type == "program"
     
-    @pytest.mark.asyncio
     async def test_analyze_line_no_issue(self, code_analyzer, mock_plugin, sample_file_change):
         """Test analyze_line when no issue is found."""
-        ast = ASTNode(
-            node_type="program",
-            start_line=1,
-            end_line=10,
-            start_column=0,
-            end_column=0,
-        )
-        rule = AnalysisRule(
-            name="test_rule",
-            category=CommentCategory.BUG,
-            severity=CommentSeverity.WARNING,
-            pattern="Test pattern",
-            llm_prompt="Check for issues",
-        )
-        
         code_analyzer.llm_client.analyze_code = AsyncMock(return_value=None)
         
         comment = await code_analyzer.analyze_line(
             "String name = 'test';",
             5,
             sample_file_change,
-            ast,
-            rule,
+            _DEFAULT_AST,
+            _DEFAULT_RULE,
             mock_plugin,
         )
         
         assert comment is None
     
-    @pytest.mark.asyncio
     async def test_analyze_line_with_issue(self, code_analyzer, mock_plugin, sample_file_change):
         """Test analyze_line when an issue is found."""
-        ast = ASTNode(
-            node_type="program",
-            start_line=1,
-            end_line=10,
-            start_column=0,
-            end_column=0,
-        )
-        rule = AnalysisRule(
-            name="test_rule",
-            category=CommentCategory.BUG,
-            severity=CommentSeverity.WARNING,
-            pattern="Test pattern",
-            llm_prompt="Check for issues",
-        )
-        
         code_analyzer.llm_client.analyze_code = AsyncMock(
             return_value="Null pointer risk detected. Suggestion: Add null check."
         )
@@ -319,8 +295,8 @@ class TestCodeAnalyzer:
             "String name = null;",
             5,
             sample_file_change,
-            ast,
-            rule,
+            _DEFAULT_AST,
+            _DEFAULT_RULE,
             mock_plugin,
         )
         
@@ -332,33 +308,18 @@ class TestCodeAnalyzer:
         assert "Null pointer risk" in comment.message
         assert comment.suggestion == "Add null check."
     
-    @pytest.mark.asyncio
-    async def test_analyze_line_handles_exceptions(self, code_analyzer, mock_plugin, sample_file_change):
+    async def test_analyze_line_handles_exceptions(self, code_analyzer, mock_plugin, sample_file_change, monkeypatch):
         """Test analyze_line handles exceptions gracefully."""
-        ast = ASTNode(
-            node_type="program",
-            start_line=1,
-            end_line=10,
-            start_column=0,
-            end_column=0,
-        )
-        rule = AnalysisRule(
-            name="test_rule",
-            category=CommentCategory.BUG,
-            severity=CommentSeverity.WARNING,
-            pattern="Test pattern",
-            llm_prompt="Check for issues",
-        )
-        
-        # Mock extract_context to raise an exception
-        mock_plugin.extract_context = AsyncMock(side_effect=Exception("Context error"))
+        # Mock extract_context to raise an exception; monkeypatch restores the
+        # shared plugin's original mock after the test
+        monkeypatch.setattr(mock_plugin, "extract_context", AsyncMock(side_effect=Exception("Context error")))
         
         comment = await code_analyzer.analyze_line(
             "String name = null;",
             5,
             sample_file_change,
-            ast,
-            rule,
+            _DEFAULT_AST,
+            _DEFAULT_RULE,
             mock_plugin,
         )
         
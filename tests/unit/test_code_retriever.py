@@ -1,13 +1,8 @@
 """Unit tests for CodeRetriever component."""
 
 import pytest
+from types import SimpleNamespace
 from unittest.mock import Mock, MagicMock, patch, AsyncMock
-from azure.devops.v7_1.git.models import (
-    GitPullRequest,
-    GitPullRequestChange,
-    IdentityRef,
-    GitCommitRef,
-)
 
 from app.services.code_retriever import (
     CodeRetriever,
@@ -19,6 +14,33 @@ from app.models.file_change import ChangeType
 from app.models.pr_event import PRMetadata
 
 
+# Inputs for the line change parsing tests
+_ADD_TARGET = "line 1\nline 2\nline 3"
+_DELETE_SOURCE = "line 1\nline 2\nline 3"
+_EDIT_SOURCE = "line 1\nline 2\nline 3"
+_EDIT_TARGET = "line 1\nmodified line 2\nline 3\nline 4"
+_LARGE_SOURCE = "\n".join(f"line {i}" for i in range(1, 1001))
+_LARGE_TARGET = "new first line\n" + _LARGE_SOURCE
+
+
+# SDK errors raised by mocks. Mock raises an exception class as a fresh
+# instance, so no instance (and its growing __traceback__) is shared
+# between tests.
+class _NotFoundError(Exception):
+    def __init__(self):
+        super().__init__("not found")
+
+
+class _UnauthorizedError(Exception):
+    def __init__(self):
+        super().__init__("unauthorized")
+
+
+class _TransientError(Exception):
+    def __init__(self):
+        super().__init__("Temporary error")
+
+
 @pytest.fixture
 def mock_git_client():
     """Create a mock GitClient."""
@@ -26,43 +48,47 @@ def mock_git_client():
     return client
 
 
+@pytest.fixture(scope="module")
+def patched_connection():
+    """Patch the Azure DevOps Connection once for the whole module."""
+    with patch('app.services.code_retriever.Connection') as mock_conn:
+        yield mock_conn
+
+
 @pytest.fixture
-def code_retriever(mock_git_client):
+def code_retriever(patched_connection, mock_git_client):
     """Create CodeRetriever instance with mocked client."""
-    with patch('app.services.code_retriever.Connection') as mock_conn:
-        mock_conn.return_value.clients.get_git_client.return_value = mock_git_client
-        retriever = CodeRetriever(
-            organization_url="https://dev.azure.com/test-org",
-            personal_access_token="test-pat"
-        )
-        return retriever
+    patched_connection.reset_mock()
+    patched_connection.return_value.clients.get_git_client.return_value = mock_git_client
+    return CodeRetriever(
+        organization_url="https://dev.azure.com/test-org",
+        personal_access_token="test-pat"
+    )
 
 
 @pytest.fixture
 def mock_pr():
-    """Create a mock GitPullRequest object."""
-    pr = Mock(spec=GitPullRequest)
-    pr.pull_request_id = 123
-    pr.source_ref_name = "refs/heads/feature/test"
-    pr.target_ref_name = "refs/heads/main"
-    pr.title = "Test PR"
-    pr.description = "Test description"
-    
-    # Mock author
-    author = Mock(spec=IdentityRef)
-    author.display_name = "Test User"
-    pr.created_by = author
-    
-    # Mock commits
-    source_commit = Mock(spec=GitCommitRef)
-    source_commit.commit_id = "abc123"
-    pr.last_merge_source_commit = source_commit
-    
-    target_commit = Mock(spec=GitCommitRef)
-    target_commit.commit_id = "def456"
-    pr.last_merge_target_commit = target_commit
+    """Create a stand-in for the GitPullRequest fields CodeRetriever reads."""
+    return SimpleNamespace(
+        pull_request_id=123,
+        source_ref_name="refs/heads/feature/test",
+        target_ref_name="refs/heads/main",
+        title="Test PR",
+        description="Test description",
+        created_by=SimpleNamespace(display_name="Test User"),
+        last_merge_source_commit=SimpleNamespace(commit_id="abc123"),
+        last_merge_target_commit=SimpleNamespace(commit_id="def456"),
+    )
+
+
+def test_mock_pr_matches_sdk_models(mock_pr):
+    """Test that the mock_pr stand-in only uses attributes the SDK models define."""
+    from azure.devops.v7_1.git.models import GitCommitRef, GitPullRequest, IdentityRef
     
-    return pr
+    for name in vars(mock_pr):
+        assert name in GitPullRequest._attribute_map
+    assert "display_name" in IdentityRef._attribute_map
+    assert "commit_id" in GitCommitRef._attribute_map
 
 
 class TestCodeRetriever:
@@ -82,7 +108,30 @@ class TestCodeRetriever:
             assert retriever.base_delay == 1.0
             assert retriever.max_delay == 60.0
 
-    @pytest.mark.asyncio
+    async def test_injected_git_client_is_reused(self, mock_git_client, mock_pr):
+        """Test that an injected GitClient is used for every call without a new connection."""
+        mock_git_client.get_pull_request.return_value = mock_pr
+        mock_git_client.get_item_content.return_value = [b"content"]
+        
+        with patch('app.services.code_retriever.Connection') as mock_conn:
+            retriever = CodeRetriever(
+                organization_url="https://dev.azure.com/test-org",
+                personal_access_token="test-pat",
+                git_client=mock_git_client
+            )
+            
+            await retriever.get_pr_metadata(repository_id="test-repo", pr_id=123)
+            await retriever.get_file_content(
+                repository_id="test-repo",
+                file_path="test.py",
+                commit_id="abc123"
+            )
+        
+        mock_conn.assert_not_called()
+        assert retriever.git_client is mock_git_client
+        mock_git_client.get_pull_request.assert_called_once()
+        mock_git_client.get_item_content.assert_called_once()
+
     async def test_get_pr_metadata_success(self, code_retriever, mock_git_client, mock_pr):
         """Test successful PR metadata retrieval."""
         mock_git_client.get_pull_request.return_value = mock_pr
@@ -103,10 +152,9 @@ class TestCodeRetriever:
         assert metadata.source_commit_id == "abc123"
         assert metadata.target_commit_id == "def456"
 
-    @pytest.mark.asyncio
     async def test_get_pr_metadata_not_found(self, code_retriever, mock_git_client):
         """Test PR metadata retrieval with not found error."""
-        mock_git_client.get_pull_request.side_effect = Exception("not found")
+        mock_git_client.get_pull_request.side_effect = _NotFoundError
         
         with pytest.raises(PermanentError):
             await code_retriever.get_pr_metadata(
@@ -114,25 +162,25 @@ class TestCodeRetriever:
                 pr_id=999
             )
 
-    @pytest.mark.asyncio
-    async def test_retry_with_backoff_success_on_retry(self, code_retriever):
+    @patch('app.services.code_retriever.asyncio.sleep', new_callable=AsyncMock)
+    async def test_retry_with_backoff_success_on_retry(self, mock_sleep, code_retriever):
         """Test retry logic succeeds on second attempt."""
-        mock_func = Mock()
-        mock_func.side_effect = [
-            Exception("Temporary error"),
+        # SDK calls are synchronous and run in a worker thread, so a plain
+        # Mock (not AsyncMock) matches the production contract
+        mock_func = Mock(side_effect=[
+            _TransientError,
             "success"
-        ]
+        ])
         
         result = await code_retriever._retry_with_backoff(mock_func)
         
         assert result == "success"
         assert mock_func.call_count == 2
+        mock_sleep.assert_awaited_once_with(code_retriever.base_delay)
 
-    @pytest.mark.asyncio
     async def test_retry_with_backoff_permanent_error(self, code_retriever):
         """Test retry logic fails immediately on permanent error."""
-        mock_func = Mock()
-        mock_func.side_effect = Exception("unauthorized")
+        mock_func = Mock(side_effect=_UnauthorizedError)
         
         with pytest.raises(PermanentError):
             await code_retriever._retry_with_backoff(mock_func)
@@ -140,32 +188,46 @@ class TestCodeRetriever:
         # Should only try once for permanent errors
         assert mock_func.call_count == 1
 
-    @pytest.mark.asyncio
-    async def test_retry_with_backoff_exhausted(self, code_retriever):
+    @patch('app.services.code_retriever.asyncio.sleep', new_callable=AsyncMock)
+    async def test_retry_with_backoff_exhausted(self, mock_sleep, code_retriever):
         """Test retry logic exhausts all attempts."""
-        mock_func = Mock()
-        mock_func.side_effect = Exception("Temporary error")
+        mock_func = Mock(side_effect=_TransientError)
         
         with pytest.raises(TransientError):
             await code_retriever._retry_with_backoff(mock_func)
         
-        # Should try max_retries times
+        # Should try max_retries times, backing off exponentially in between
         assert mock_func.call_count == code_retriever.max_retries
+        assert [call.args[0] for call in mock_sleep.await_args_list] == [1.0, 2.0]
 
-    @pytest.mark.asyncio
     async def test_get_file_content_success(self, code_retriever, mock_git_client):
         """Test successful file content retrieval."""
         mock_git_client.get_item_content.return_value = [b"line 1\n", b"line 2\n"]
         
+        with patch('app.services.code_retriever.log_api_call') as mock_log_api_call:
+            content = await code_retriever.get_file_content(
+                repository_id="test-repo",
+                file_path="test.py",
+                commit_id="abc123"
+            )
+        
+        assert content == "line 1\nline 2\n"
+        # Logged under the SDK call's name, not the stream-draining wrapper's
+        assert mock_log_api_call.call_args.kwargs["endpoint"] == "get_item_content"
+
+    async def test_get_file_content_many_chunks(self, code_retriever, mock_git_client):
+        """Test that a content stream of many small chunks is joined in order."""
+        chunks = [f"line {i}\n".encode() for i in range(1000)]
+        mock_git_client.get_item_content.return_value = iter(chunks)
+        
         content = await code_retriever.get_file_content(
             repository_id="test-repo",
             file_path="test.py",
             commit_id="abc123"
         )
         
-        assert content == "line 1\nline 2\n"
+        assert content == b"".join(chunks).decode()
 
-    @pytest.mark.asyncio
     async def test_get_file_content_binary_file(self, code_retriever):
         """Test binary file is skipped."""
         content = await code_retriever.get_file_content(
@@ -176,97 +238,93 @@ class TestCodeRetriever:
         
         assert content is None
 
-    @pytest.mark.asyncio
     async def test_get_file_content_not_found(self, code_retriever, mock_git_client):
         """Test file content retrieval when file doesn't exist."""
-        mock_git_client.get_item_content.side_effect = Exception("File not found")
+        mock_git_client.get_item_content.side_effect = _NotFoundError
         
-        content = await code_retriever.get_file_content(
-            repository_id="test-repo",
-            file_path="missing.py",
-            commit_id="abc123"
-        )
+        with patch('app.services.code_retriever.log_api_call') as mock_log_api_call:
+            content = await code_retriever.get_file_content(
+                repository_id="test-repo",
+                file_path="missing.py",
+                commit_id="abc123"
+            )
         
         # Should return None instead of raising exception
         assert content is None
+        assert mock_log_api_call.call_args.kwargs["endpoint"] == "get_item_content"
 
-    def test_is_binary_file(self, code_retriever):
+    @pytest.mark.parametrize("file_path,expected", [
+        ("image.png", True),
+        ("document.pdf", True),
+        ("archive.zip", True),
+        ("library.jar", True),
+        ("font.woff", True),
+        ("assets/Logo.PNG", True),
+        ("release.tar.gz", True),
+        ("script.py", False),
+        ("style.css", False),
+        ("code.java", False),
+        ("config.json", False),
+        ("Makefile", False),
+    ])
+    def test_is_binary_file(self, code_retriever, file_path, expected):
         """Test binary file detection."""
-        assert code_retriever._is_binary_file("image.png") is True
-        assert code_retriever._is_binary_file("document.pdf") is True
-        assert code_retriever._is_binary_file("archive.zip") is True
-        assert code_retriever._is_binary_file("library.jar") is True
-        assert code_retriever._is_binary_file("font.woff") is True
-        
-        assert code_retriever._is_binary_file("script.py") is False
-        assert code_retriever._is_binary_file("style.css") is False
-        assert code_retriever._is_binary_file("code.java") is False
-        assert code_retriever._is_binary_file("config.json") is False
+        assert code_retriever._is_binary_file(file_path) is expected
 
-    def test_map_change_type(self, code_retriever):
+    @pytest.mark.parametrize("azure_change_type,expected", [
+        ("add", ChangeType.ADD),
+        ("Add", ChangeType.ADD),
+        ("delete", ChangeType.DELETE),
+        ("Delete", ChangeType.DELETE),
+        ("edit", ChangeType.EDIT),
+        ("Edit", ChangeType.EDIT),
+        ("rename", ChangeType.EDIT),
+        ("edit, rename", ChangeType.EDIT),
+        ("delete, sourceRename", ChangeType.DELETE),
+    ])
+    def test_map_change_type(self, code_retriever, azure_change_type, expected):
         """Test Azure DevOps change type mapping."""
-        assert code_retriever._map_change_type("add") == ChangeType.ADD
-        assert code_retriever._map_change_type("Add") == ChangeType.ADD
-        assert code_retriever._map_change_type("delete") == ChangeType.DELETE
-        assert code_retriever._map_change_type("Delete") == ChangeType.DELETE
-        assert code_retriever._map_change_type("edit") == ChangeType.EDIT
-        assert code_retriever._map_change_type("Edit") == ChangeType.EDIT
-        assert code_retriever._map_change_type("rename") == ChangeType.EDIT
-
-    def test_parse_line_changes_add(self, code_retriever):
-        """Test line change parsing for file addition."""
-        target_content = "line 1\nline 2\nline 3"
-        
-        added, modified, deleted = code_retriever._parse_line_changes(
-            source_content=None,
-            target_content=target_content,
-            change_type=ChangeType.ADD
-        )
-        
-        assert len(added) == 3
-        assert len(modified) == 0
-        assert len(deleted) == 0
-        assert added[0].line_number == 1
-        assert added[0].content == "line 1"
-        assert added[0].change_type == ChangeType.ADD
-
-    def test_parse_line_changes_delete(self, code_retriever):
-        """Test line change parsing for file deletion."""
-        source_content = "line 1\nline 2\nline 3"
-        
-        added, modified, deleted = code_retriever._parse_line_changes(
-            source_content=source_content,
-            target_content=None,
-            change_type=ChangeType.DELETE
-        )
-        
-        assert len(added) == 0
-        assert len(modified) == 0
-        assert len(deleted) == 3
-        assert deleted[0].line_number == 1
-        assert deleted[0].content == "line 1"
-        assert deleted[0].change_type == ChangeType.DELETE
-
-    def test_parse_line_changes_edit(self, code_retriever):
-        """Test line change parsing for file modification."""
-        source_content = "line 1\nline 2\nline 3"
-        target_content = "line 1\nmodified line 2\nline 3\nline 4"
-        
+        assert code_retriever._map_change_type(azure_change_type) == expected
+
+    @pytest.mark.parametrize("source_content,target_content,change_type,expected_counts,first_changes", [
+        (
+            None, _ADD_TARGET, ChangeType.ADD, (3, 0, 0),
+            {"added": (1, "line 1", ChangeType.ADD)},
+        ),
+        (
+            _DELETE_SOURCE, None, ChangeType.DELETE, (0, 0, 3),
+            {"deleted": (1, "line 1", ChangeType.DELETE)},
+        ),
+        (
+            # Line 2 modified, line 4 added
+            _EDIT_SOURCE, _EDIT_TARGET, ChangeType.EDIT, (1, 1, 0),
+            {
+                "modified": (2, "modified line 2", ChangeType.EDIT),
+                "added": (4, "line 4", ChangeType.ADD),
+            },
+        ),
+        (
+            # A line inserted at the top must not shift the other 1000 lines
+            _LARGE_SOURCE, _LARGE_TARGET, ChangeType.EDIT, (1, 0, 0),
+            {"added": (1, "new first line", ChangeType.ADD)},
+        ),
+    ], ids=["add", "delete", "edit", "edit_large_insert"])
+    def test_parse_line_changes(
+        self, code_retriever, source_content, target_content, change_type,
+        expected_counts, first_changes
+    ):
+        """Test line change parsing for file addition, deletion and modification."""
         added, modified, deleted = code_retriever._parse_line_changes(
             source_content=source_content,
             target_content=target_content,
-            change_type=ChangeType.EDIT
+            change_type=change_type
         )
         
-        # Line 2 modified, line 4 added
-        assert len(modified) == 1
-        assert len(added) == 1
-        assert len(deleted) == 0
-        
-        assert modified[0].line_number == 2
-        assert modified[0].content == "modified line 2"
-        assert modified[0].change_type == ChangeType.EDIT
+        assert (len(added), len(modified), len(deleted)) == expected_counts
         
-        assert added[0].line_number == 4
-        assert added[0].content == "line 4"
-        assert added[0].change_type == ChangeType.ADD
+        changes = {"added": added, "modified": modified, "deleted": deleted}
+        for kind, (line_number, content, line_change_type) in first_changes.items():
+            first = changes[kind][0]
+            assert first.line_number == line_number
+            assert first.content == content
+            assert first.change_type == line_change_type
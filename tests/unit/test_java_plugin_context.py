@@ -0,0 +1,83 @@
+"""
+Unit tests for Java plugin context extraction.
+"""
+
+
+JAVA_SOURCE = """import java.util.List;
+import java.util.Map;
+
+public class OrderService {
+    private Map<String, Integer> counts;
+
+    public int countOrders(List<String> orders) {
+        int total = 0;
+        for (String order : orders) {
+            total += 1;
+        }
+        return total;
+    }
+}
+"""
+
+
+class TestJavaPluginContext:
+    """Test Java plugin context extraction."""
+
+    async def test_extract_context_inside_method(self, java_plugin):
+        """Test that class, method, imports and surrounding lines are extracted."""
+        ast = await java_plugin.parse_file("OrderService.java", JAVA_SOURCE)
+
+        context = await java_plugin.extract_context(10, ast, JAVA_SOURCE)
+
+        assert context.language == "java"
+        assert context.line_number == 10
+        assert context.enclosing_class == "OrderService"
+        assert context.enclosing_method == "countOrders(List<String> orders)"
+        assert context.imports == ["import java.util.List;", "import java.util.Map;"]
+        assert "            total += 1;" in context.surrounding_lines
+
+    async def test_extract_context_outside_method(self, java_plugin):
+        """Test that a field line has a class but no enclosing method."""
+        ast = await java_plugin.parse_file("OrderService.java", JAVA_SOURCE)
+
+        context = await java_plugin.extract_context(5, ast, JAVA_SOURCE)
+
+        assert context.enclosing_class == "OrderService"
+        assert context.enclosing_method is None
+
+    async def test_file_context_is_cached_per_ast(self, java_plugin):
+        """Test that file-level context is computed once per parsed file."""
+        ast = await java_plugin.parse_file("OrderService.java", JAVA_SOURCE)
+
+        first = java_plugin._get_file_context(ast, JAVA_SOURCE)
+        second = java_plugin._get_file_context(ast, JAVA_SOURCE)
+
+        assert first is second
+        assert first["lines"] == JAVA_SOURCE.split("\n")
+
+    async def test_extract_context_after_non_ascii_text(self, java_plugin):
+        """Test that names are sliced correctly when earlier text is multi-byte."""
+        source = "// Überprüfung der Größe\n" + JAVA_SOURCE
+        ast = await java_plugin.parse_file("OrderService.java", source)
+
+        context = await java_plugin.extract_context(11, ast, source)
+
+        assert context.enclosing_class == "OrderService"
+        assert context.enclosing_method == "countOrders(List<String> orders)"
+        assert context.imports == ["import java.util.List;", "import java.util.Map;"]
+
+    async def test_extract_context_on_closing_line_with_trailing_comment(self, java_plugin):
+        """Test that a comment after a method's closing brace does not hide the method."""
+        source = (
+            "public class Counter {\n"
+            "    int count() {\n"
+            "        return 1;\n"
+            "    } // end count\n"
+            "}\n"
+        )
+        ast = await java_plugin.parse_file("Counter.java", source)
+
+        context = await java_plugin.extract_context(4, ast, source)
+
+        assert context.enclosing_class == "Counter"
+        assert context.enclosing_method == "count()"
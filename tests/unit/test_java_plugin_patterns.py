@@ -2,21 +2,10 @@
 Unit tests for Java plugin design pattern detection.
 """
 
-import pytest
-from pathlib import Path
-from plugins.java.plugin import JavaPlugin
-
 
 class TestJavaPluginPatternDetection:
     """Test Java plugin design pattern detection."""
     
-    @pytest.fixture
-    def java_plugin(self):
-        """Create a Java plugin instance."""
-        config_path = Path("plugins/java/config.yaml")
-        return JavaPlugin(config_path=config_path)
-    
-    @pytest.mark.asyncio
     async def test_detect_singleton_pattern(self, java_plugin):
         """Test detection of Singleton pattern."""
         # Singleton pattern example
@@ -50,7 +39,6 @@ class TestJavaPluginPatternDetection:
         assert singleton_patterns[0].pattern_type == "creational"
         assert "private constructor" in singleton_patterns[0].description.lower()
     
-    @pytest.mark.asyncio
     async def test_detect_factory_pattern(self, java_plugin):
         """Test detection of Factory pattern."""
         # Factory pattern example
@@ -80,7 +68,6 @@ class TestJavaPluginPatternDetection:
         assert factory_patterns[0].pattern_type == "creational"
         assert "factory method" in factory_patterns[0].description.lower()
     
-    @pytest.mark.asyncio
     async def test_detect_builder_pattern(self, java_plugin):
         """Test detection of Builder pattern."""
         # Builder pattern example
@@ -128,7 +115,6 @@ class TestJavaPluginPatternDetection:
         assert builder_patterns[0].pattern_type == "creational"
         assert "fluent interface" in builder_patterns[0].description.lower()
     
-    @pytest.mark.asyncio
     async def test_no_patterns_in_simple_class(self, java_plugin):
         """Test that simple classes don't trigger pattern detection."""
         # Simple class without patterns
@@ -153,7 +139,31 @@ class TestJavaPluginPatternDetection:
         # Should not detect any patterns
         assert len(patterns) == 0
     
-    @pytest.mark.asyncio
+    async def test_singleton_not_detected_from_comment_text(self, java_plugin):
+        """Test that keywords in comments do not trigger Singleton detection."""
+        # Mentions "static getInstance" only inside a comment
+        not_singleton_code = """
+        public class Registry {
+            private static Registry instance;
+            
+            private Registry() {}
+            
+            public Registry lookup() {
+                // unlike a static getInstance() accessor, this is per-caller
+                return this;
+            }
+        }
+        """
+        
+        # Parse the code
+        ast = await java_plugin.parse_file("Registry.java", not_singleton_code)
+        
+        # Detect patterns
+        patterns = await java_plugin.detect_patterns(ast)
+        
+        pattern_names = [p.pattern_name for p in patterns]
+        assert "Singleton" not in pattern_names
+    
     async def test_multiple_patterns_in_same_file(self, java_plugin):
         """Test detection of multiple patterns in the same file."""
         # Code with both Factory and Singleton patterns
@@ -195,7 +205,6 @@ class TestJavaPluginPatternDetection:
         assert "Singleton" in pattern_names
         assert "Factory" in pattern_names
     
-    @pytest.mark.asyncio
     async def test_pattern_detection_returns_correct_structure(self, java_plugin):
         """Test that detected patterns have correct structure."""
         singleton_code = """
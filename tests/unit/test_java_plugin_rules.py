@@ -3,21 +3,31 @@ Unit tests for Java plugin analysis rules and LLM prompts.
 """
 
 import pytest
-from pathlib import Path
-from plugins.java.plugin import JavaPlugin
 from app.models.comment import CommentCategory, CommentSeverity
 
 
+# Rules enabled in plugins/java/config.yaml
+_CONFIGURED_RULES = [
+    'avoid_null_pointer',
+    'resource_leak',
+    'exception_handling',
+    'naming_conventions',
+    'code_complexity',
+    'unused_imports',
+    'magic_numbers',
+    'long_methods',
+]
+
+
+@pytest.fixture(scope="session")
+def rules_by_name(java_plugin_rules):
+    """Index the configured Java analysis rules by name."""
+    return {rule.name: rule for rule in java_plugin_rules}
+
+
 class TestJavaPluginRules:
     """Test Java plugin analysis rules configuration."""
     
-    @pytest.fixture
-    def java_plugin(self):
-        """Create a Java plugin instance."""
-        config_path = Path("plugins/java/config.yaml")
-        return JavaPlugin(config_path=config_path)
-    
-    @pytest.mark.asyncio
     async def test_get_analysis_rules_returns_all_configured_rules(self, java_plugin):
         """Test that all configured rules are returned."""
         rules = await java_plugin.get_analysis_rules()
@@ -27,112 +37,60 @@ class TestJavaPluginRules:
         
         # Check rule names
         rule_names = [rule.name for rule in rules]
-        expected_rules = [
-            'avoid_null_pointer',
-            'resource_leak',
-            'exception_handling',
-            'naming_conventions',
-            'code_complexity',
-            'unused_imports',
-            'magic_numbers',
-            'long_methods'
-        ]
         
-        for expected_rule in expected_rules:
+        for expected_rule in _CONFIGURED_RULES:
             assert expected_rule in rule_names
     
-    @pytest.mark.asyncio
-    async def test_null_pointer_rule_has_detailed_prompt(self, java_plugin):
-        """Test that null pointer rule has detailed LLM prompt."""
-        rules = await java_plugin.get_analysis_rules()
-        
-        null_pointer_rule = next(
-            (r for r in rules if r.name == 'avoid_null_pointer'),
-            None
-        )
-        
-        assert null_pointer_rule is not None
-        assert null_pointer_rule.category == CommentCategory.BUG
-        assert null_pointer_rule.severity == CommentSeverity.ERROR
-        
-        # Check that the prompt is detailed (not just the default)
-        assert 'Dereferencing variables' in null_pointer_rule.llm_prompt
-        assert 'null checks' in null_pointer_rule.llm_prompt
-        assert 'Optional usage' in null_pointer_rule.llm_prompt
+    @pytest.mark.parametrize("rule_name,category,severity,required_substrings", [
+        (
+            'avoid_null_pointer', CommentCategory.BUG, CommentSeverity.ERROR,
+            ['Dereferencing variables', 'null checks', 'Optional usage'],
+        ),
+        (
+            'resource_leak', CommentCategory.BUG, CommentSeverity.WARNING,
+            ['try-with-resources', 'InputStream', 'Connection'],
+        ),
+        (
+            'exception_handling', CommentCategory.BEST_PRACTICE, CommentSeverity.WARNING,
+            ['Empty catch blocks', 'generic Exception', 'Throwable'],
+        ),
+        (
+            'naming_conventions', CommentCategory.BEST_PRACTICE, CommentSeverity.INFO,
+            ['PascalCase', 'camelCase', 'UPPER_SNAKE_CASE'],
+        ),
+    ])
+    def test_rule_has_detailed_prompt(
+        self, rules_by_name, rule_name, category, severity, required_substrings
+    ):
+        """Test that the rule has a detailed LLM prompt (not just the default)."""
+        rule = rules_by_name.get(rule_name)
+        
+        assert rule is not None
+        assert rule.category == category
+        assert rule.severity == severity
+        
+        for substring in required_substrings:
+            assert substring in rule.llm_prompt
     
-    @pytest.mark.asyncio
-    async def test_resource_leak_rule_has_detailed_prompt(self, java_plugin):
-        """Test that resource leak rule has detailed LLM prompt."""
-        rules = await java_plugin.get_analysis_rules()
-        
-        resource_leak_rule = next(
-            (r for r in rules if r.name == 'resource_leak'),
-            None
-        )
-        
-        assert resource_leak_rule is not None
-        assert resource_leak_rule.category == CommentCategory.BUG
-        assert resource_leak_rule.severity == CommentSeverity.WARNING
-        
-        # Check that the prompt is detailed
-        assert 'try-with-resources' in resource_leak_rule.llm_prompt
-        assert 'InputStream' in resource_leak_rule.llm_prompt
-        assert 'Connection' in resource_leak_rule.llm_prompt
+    def test_configured_rules_cover_returned_rules(self, rules_by_name):
+        """Test that _CONFIGURED_RULES lists exactly the rules the plugin returns."""
+        # Otherwise a newly configured rule would skip test_rule_has_required_fields
+        assert set(rules_by_name) == set(_CONFIGURED_RULES)
     
-    @pytest.mark.asyncio
-    async def test_exception_handling_rule_has_detailed_prompt(self, java_plugin):
-        """Test that exception handling rule has detailed LLM prompt."""
-        rules = await java_plugin.get_analysis_rules()
-        
-        exception_rule = next(
-            (r for r in rules if r.name == 'exception_handling'),
-            None
-        )
-        
-        assert exception_rule is not None
-        assert exception_rule.category == CommentCategory.BEST_PRACTICE
-        assert exception_rule.severity == CommentSeverity.WARNING
-        
-        # Check that the prompt is detailed
-        assert 'Empty catch blocks' in exception_rule.llm_prompt
-        assert 'generic Exception' in exception_rule.llm_prompt
-        assert 'Throwable' in exception_rule.llm_prompt
+    @pytest.mark.parametrize("rule_name", _CONFIGURED_RULES)
+    def test_rule_has_required_fields(self, rules_by_name, rule_name):
+        """Test that the rule has all required fields populated."""
+        rule = rules_by_name[rule_name]
+        
+        assert rule.name is not None and rule.name != ""
+        assert rule.category is not None
+        assert rule.severity is not None
+        assert rule.pattern is not None and rule.pattern != ""
+        assert rule.llm_prompt is not None and rule.llm_prompt != ""
+        
+        # Check that prompts are substantial (not just defaults)
+        assert len(rule.llm_prompt) > 100, f"Rule {rule.name} has too short prompt"
     
-    @pytest.mark.asyncio
-    async def test_naming_conventions_rule_has_detailed_prompt(self, java_plugin):
-        """Test that naming conventions rule has detailed LLM prompt."""
-        rules = await java_plugin.get_analysis_rules()
-        
-        naming_rule = next(
-            (r for r in rules if r.name == 'naming_conventions'),
-            None
-        )
-        
-        assert naming_rule is not None
-        assert naming_rule.category == CommentCategory.BEST_PRACTICE
-        assert naming_rule.severity == CommentSeverity.INFO
-        
-        # Check that the prompt is detailed
-        assert 'PascalCase' in naming_rule.llm_prompt
-        assert 'camelCase' in naming_rule.llm_prompt
-        assert 'UPPER_SNAKE_CASE' in naming_rule.llm_prompt
-    
-    @pytest.mark.asyncio
-    async def test_all_rules_have_required_fields(self, java_plugin):
-        """Test that all rules have required fields populated."""
-        rules = await java_plugin.get_analysis_rules()
-        
-        for rule in rules:
-            assert rule.name is not None and rule.name != ""
-            assert rule.category is not None
-            assert rule.severity is not None
-            assert rule.pattern is not None and rule.pattern != ""
-            assert rule.llm_prompt is not None and rule.llm_prompt != ""
-            
-            # Check that prompts are substantial (not just defaults)
-            assert len(rule.llm_prompt) > 100, f"Rule {rule.name} has too short prompt"
-    
-    @pytest.mark.asyncio
     async def test_rule_categories_are_appropriate(self, java_plugin):
         """Test that rules have appropriate categories."""
         rules = await java_plugin.get_analysis_rules()
@@ -155,7 +113,6 @@ class TestJavaPluginRules:
         assert 'code_complexity' in code_smell_names
         assert 'long_methods' in code_smell_names
     
-    @pytest.mark.asyncio
     async def test_rule_severities_are_appropriate(self, java_plugin):
         """Test that rules have appropriate severity levels."""
         rules = await java_plugin.get_analysis_rules()
@@ -172,3 +129,10 @@ class TestJavaPluginRules:
         # Info severity (suggestions)
         info_rules = [r for r in rules if r.severity == CommentSeverity.INFO]
         assert len(info_rules) > 0
+    
+    async def test_analysis_rules_are_built_once(self, java_plugin):
+        """Test that repeated calls reuse the rules built from configuration."""
+        first = await java_plugin.get_analysis_rules()
+        second = await java_plugin.get_analysis_rules()
+        
+        assert first is second
@@ -4,43 +4,80 @@ Unit tests for structured logging utilities.
 
 import json
 import logging
-from io import StringIO
+import os
+import threading
 
 import pytest
 
 from app.utils.logging import (
     setup_logging,
+    shutdown_logging,
     get_logger,
     JSONFormatter,
+    LogContext,
     log_pr_event,
     log_phase_transition,
     log_api_call,
 )
 
 
-def test_json_formatter():
-    """Test JSON formatter produces valid JSON output."""
-    # Create formatter
-    formatter = JSONFormatter()
+class ListHandler(logging.Handler):
+    """Handler that keeps formatted records in a list."""
     
-    # Create log record
+    def __init__(self):
+        super().__init__()
+        self.buf = []
+    
+    def emit(self, record):
+        self.buf.append(self.format(record))
+
+
+@pytest.fixture
+def capture_logger():
+    """Capture JSON-formatted records from the "test" logger."""
     logger = logging.getLogger("test")
-    logger.setLevel(logging.INFO)
+    level = logger.level
     
-    # Create string buffer to capture output
-    stream = StringIO()
-    handler = logging.StreamHandler(stream)
-    handler.setFormatter(formatter)
+    handler = ListHandler()
+    handler.setFormatter(JSONFormatter())
     logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    
+    yield handler
+    
+    logger.removeHandler(handler)
+    logger.setLevel(level)
+
+
+# Loggers whose levels setup_logging changes
+_CONFIGURED_LOGGERS = ("", "urllib3", "azure", "openai", "httpx", "httpcore")
+
+
+@pytest.fixture
+def restore_logging():
+    """Undo the global logging configuration done by setup_logging."""
+    root = logging.getLogger()
+    handlers = list(root.handlers)
+    levels = {name: logging.getLogger(name).level for name in _CONFIGURED_LOGGERS}
+    
+    try:
+        yield
+    finally:
+        shutdown_logging()
+        root.handlers[:] = handlers
+        for name, level in levels.items():
+            logging.getLogger(name).setLevel(level)
+
+
+def test_json_formatter(capture_logger):
+    """Test JSON formatter produces valid JSON output."""
+    logger = logging.getLogger("test")
     
     # Log a message
     logger.info("Test message", extra={"agent_id": "agent_123", "pr_id": "456"})
     
-    # Get output
-    output = stream.getvalue()
-    
     # Parse JSON
-    log_data = json.loads(output)
+    log_data = json.loads(capture_logger.buf[-1])
     
     # Verify structure
     assert "timestamp" in log_data
@@ -52,6 +89,20 @@ def test_json_formatter():
     assert "source" in log_data
 
 
+def test_json_formatter_timestamp():
+    """Test that timestamps are ISO 8601 UTC with microseconds."""
+    formatter = JSONFormatter()
+    record = logging.LogRecord("test", logging.INFO, __file__, 1, "Message", None, None)
+    
+    record.created = 1704110400.25
+    first = json.loads(formatter.format(record))
+    record.created = 1704110401.0
+    second = json.loads(formatter.format(record))
+    
+    assert first["timestamp"] == "2024-01-01T12:00:00.250000Z"
+    assert second["timestamp"] == "2024-01-01T12:00:01.000000Z"
+
+
 def test_get_logger_with_context():
     """Test getting logger with context."""
     logger = get_logger("test_module", agent_id="agent_123", pr_id="456")
@@ -60,23 +111,57 @@ def test_get_logger_with_context():
     assert logger.extra["pr_id"] == "456"
 
 
-def test_log_pr_event():
+def test_get_logger_shares_base_logger():
+    """Test that adapters for one name share the logger but not their context."""
+    first = get_logger("test_module", agent_id="agent_123")
+    second = get_logger("test_module", agent_id="agent_123")
+    
+    assert first is not second
+    assert first.logger is second.logger is logging.getLogger("test_module")
+    
+    with LogContext(first, phase="initialize"):
+        assert "phase" not in second.extra
+
+
+def test_logger_context_in_json_output(capture_logger):
+    """Test that adapter context is written as top-level fields."""
+    logger = get_logger("test", agent_id="agent_123", component="analyzer")
+    
+    logger.info("First", extra={"pr_id": "456"})
+    with LogContext(logger, phase="initialize"):
+        logger.info("Second")
+    
+    first, second = (json.loads(line) for line in capture_logger.buf[-2:])
+    
+    assert first["agent_id"] == "agent_123"
+    assert first["pr_id"] == "456"
+    assert first["context"] == {"component": "analyzer"}
+    assert second["agent_id"] == "agent_123"
+    assert second["phase"] == "initialize"
+    assert "phase" not in logger.extra
+
+
+def test_json_formatter_non_string_keys_and_wide_ints(capture_logger):
+    """Test that extra values orjson rejects are still serialized."""
+    logger = logging.getLogger("test")
+    
+    logger.info("Mapped", extra={"mapping": {1: "a"}})
+    logger.info("Wide", extra={"count": 2 ** 70})
+    
+    mapped, wide = (json.loads(line) for line in capture_logger.buf[-2:])
+    
+    assert mapped["context"]["mapping"] == {"1": "a"}
+    assert wide["context"]["count"] == 2 ** 70
+
+
+def test_log_pr_event(capture_logger):
     """Test PR event logging."""
     logger = get_logger("test")
     
-    # Create string buffer to capture output
-    stream = StringIO()
-    handler = logging.StreamHandler(stream)
-    handler.setFormatter(JSONFormatter())
-    logger.logger.addHandler(handler)
-    logger.logger.setLevel(logging.INFO)
-    
     # Log PR event
     log_pr_event(logger, pr_id="123", repository_id="repo_456", event_type="git.pullrequest.created")
     
-    # Get output
-    output = stream.getvalue()
-    log_data = json.loads(output)
+    log_data = json.loads(capture_logger.buf[-1])
     
     # Verify
     assert log_data["pr_id"] == "123"
@@ -84,23 +169,14 @@ def test_log_pr_event():
     assert "event_type" in log_data["context"]
 
 
-def test_log_phase_transition():
+def test_log_phase_transition(capture_logger):
     """Test phase transition logging."""
     logger = get_logger("test")
     
-    # Create string buffer to capture output
-    stream = StringIO()
-    handler = logging.StreamHandler(stream)
-    handler.setFormatter(JSONFormatter())
-    logger.logger.addHandler(handler)
-    logger.logger.setLevel(logging.INFO)
-    
     # Log phase transition
     log_phase_transition(logger, agent_id="agent_123", pr_id="456", phase="initialize", status="started")
     
-    # Get output
-    output = stream.getvalue()
-    log_data = json.loads(output)
+    log_data = json.loads(capture_logger.buf[-1])
     
     # Verify
     assert log_data["agent_id"] == "agent_123"
@@ -109,17 +185,10 @@ def test_log_phase_transition():
     assert "status" in log_data["context"]
 
 
-def test_log_api_call():
+def test_log_api_call(capture_logger):
     """Test API call logging."""
     logger = get_logger("test")
     
-    # Create string buffer to capture output
-    stream = StringIO()
-    handler = logging.StreamHandler(stream)
-    handler.setFormatter(JSONFormatter())
-    logger.logger.addHandler(handler)
-    logger.logger.setLevel(logging.INFO)
-    
     # Log API call
     log_api_call(
         logger,
@@ -130,9 +199,7 @@ def test_log_api_call():
         duration_ms=150.5
     )
     
-    # Get output
-    output = stream.getvalue()
-    log_data = json.loads(output)
+    log_data = json.loads(capture_logger.buf[-1])
     
     # Verify
     assert "service" in log_data["context"]
@@ -142,15 +209,9 @@ def test_log_api_call():
     assert "duration_ms" in log_data["context"]
 
 
-def test_log_api_call_with_error():
+def test_log_api_call_with_error(capture_logger):
     """Test API call logging with error."""
     logger = get_logger("test")
-    
-    # Create string buffer to capture output
-    stream = StringIO()
-    handler = logging.StreamHandler(stream)
-    handler.setFormatter(JSONFormatter())
-    logger.logger.addHandler(handler)
     logger.logger.setLevel(logging.ERROR)
     
     # Log API call with error
@@ -162,14 +223,53 @@ def test_log_api_call_with_error():
         error="Connection timeout"
     )
     
-    # Get output
-    output = stream.getvalue()
-    log_data = json.loads(output)
+    log_data = json.loads(capture_logger.buf[-1])
     
     # Verify
     assert log_data["level"] == "ERROR"
     assert "error" in log_data["context"]
 
 
+def test_setup_logging_writes_through_queue(capfd, restore_logging):
+    """Test that records queued by setup_logging are written on shutdown."""
+    setup_logging("INFO")
+    try:
+        logger = logging.getLogger("test_queue")
+        try:
+            raise ValueError("bad value")
+        except ValueError:
+            logger.error("Failed %s", "step", exc_info=True, extra={"agent_id": "agent_123"})
+    finally:
+        shutdown_logging()
+    
+    log_data = json.loads(capfd.readouterr().out.strip().splitlines()[-1])
+    
+    assert log_data["message"] == "Failed step"
+    assert log_data["agent_id"] == "agent_123"
+    assert log_data["error"]["type"] == "ValueError"
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork")
+def test_setup_logging_survives_fork(restore_logging):
+    """Test that logging's module lock is usable in a child forked after setup."""
+    setup_logging("INFO")
+    try:
+        pid = os.fork()
+        if pid == 0:
+            # A handler logging cannot reinitialize leaves the lock held
+            acquired = []
+            thread = threading.Thread(
+                target=lambda: acquired.append(logging._lock.acquire(timeout=2))
+            )
+            thread.start()
+            thread.join()
+            os._exit(0 if acquired == [True] else 1)
+        _, status = os.waitpid(pid, 0)
+    finally:
+        shutdown_logging()
+    
+    assert os.waitstatus_to_exitcode(status) == 0
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -2,8 +2,10 @@
 Unit tests for metrics collection utilities.
 """
 
+import logging
 import pytest
 from datetime import datetime
+from unittest.mock import MagicMock
 
 from app.utils.metrics import MetricsCollector, emit_metric
 
@@ -96,8 +98,8 @@ def test_metrics_collector_record_api_call():
     
     assert collector.api_calls["azure_devops"] == 2
     assert collector.api_calls["openai"] == 1
-    assert len(collector.api_latencies["azure_devops"]) == 2
-    assert len(collector.api_latencies["openai"]) == 1
+    assert list(collector.api_latency_stats["azure_devops"]) == [350.5, 150.5, 200.0]
+    assert list(collector.api_latency_stats["openai"]) == [500.0, 500.0, 500.0]
 
 
 def test_metrics_collector_get_summary():
@@ -126,6 +128,17 @@ def test_metrics_collector_get_summary():
     assert "azure_devops" in summary["api_latencies"]
     assert summary["api_latencies"]["azure_devops"]["count"] == 2
     assert summary["api_latencies"]["azure_devops"]["avg_ms"] == 175.0
+    assert summary["api_latencies"]["azure_devops"]["min_ms"] == 150.0
+    assert summary["api_latencies"]["azure_devops"]["max_ms"] == 200.0
+
+
+def test_metrics_collector_uses_slots():
+    """Test that collectors reject attributes outside their slots."""
+    collector = MetricsCollector("agent_123", "456", "repo_789")
+    
+    assert not hasattr(collector, "__dict__")
+    with pytest.raises(AttributeError):
+        collector.unknown_field = 1
 
 
 def test_emit_metric():
@@ -134,5 +147,18 @@ def test_emit_metric():
     emit_metric("test_metric", 42.0, tag1="value1", tag2="value2")
 
 
+def test_emit_metric_is_noop_when_disabled(caplog, monkeypatch):
+    """Test that nothing is logged when metric logging is disabled."""
+    from app.utils import metrics
+    
+    info = MagicMock()
+    monkeypatch.setattr(metrics.logger, "info", info)
+    
+    with caplog.at_level(logging.WARNING, logger="app.utils.metrics"):
+        emit_metric("test_metric", 42.0, tag1="value1")
+    
+    info.assert_not_called()
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -1,5 +1,6 @@
 """Unit tests for PluginManager."""
 
+import os
 import pytest
 from pathlib import Path
 from typing import List
@@ -9,20 +10,24 @@ from app.models.analysis import ASTNode, CodeContext, AnalysisRule, CodeIssue, D
 from app.models.comment import CommentSeverity, CommentCategory
 
 
-class MockJavaPlugin(LanguagePlugin):
-    """Mock Java plugin for testing."""
+class MockPlugin(LanguagePlugin):
+    """Mock language plugin for testing."""
+    
+    def __init__(self, language: str, extensions: List[str]):
+        self._language = language
+        self._extensions = extensions
     
     @property
     def language_name(self) -> str:
-        return "java"
+        return self._language
     
     @property
     def file_extensions(self) -> List[str]:
-        return [".java"]
+        return self._extensions
     
     async def parse_file(self, file_path: str, content: str) -> ASTNode:
         return ASTNode(
-            node_type="compilation_unit",
+            node_type="program",
             start_line=1,
             end_line=10,
             start_column=0,
@@ -38,12 +43,9 @@ class MockJavaPlugin(LanguagePlugin):
         file_content: str
     ) -> CodeContext:
         return CodeContext(
-            language="java",
-            file_path="test.java",
+            language=self._language,
+            file_path=f"test{self._extensions[0]}",
             line_number=line_number,
-            enclosing_class="TestClass",
-            enclosing_method="testMethod()",
-            imports=["java.util.List"],
             surrounding_lines=[]
         )
     
@@ -69,100 +71,64 @@ class MockJavaPlugin(LanguagePlugin):
         return []
 
 
-class MockTypeScriptPlugin(LanguagePlugin):
-    """Mock TypeScript plugin for testing."""
-    
-    @property
-    def language_name(self) -> str:
-        return "typescript"
-    
-    @property
-    def file_extensions(self) -> List[str]:
-        return [".ts", ".tsx"]
-    
-    async def parse_file(self, file_path: str, content: str) -> ASTNode:
-        return ASTNode(
-            node_type="program",
-            start_line=1,
-            end_line=10,
-            start_column=0,
-            end_column=0,
-            children=[],
-            text=content
-        )
-    
-    async def extract_context(
-        self, 
-        line_number: int, 
-        ast: ASTNode, 
-        file_content: str
-    ) -> CodeContext:
-        return CodeContext(
-            language="typescript",
-            file_path="test.ts",
-            line_number=line_number,
-            surrounding_lines=[]
-        )
-    
-    async def get_analysis_rules(self) -> List[AnalysisRule]:
-        return []
-    
-    async def format_suggestion(
-        self, 
-        issue: CodeIssue, 
-        context: CodeContext
-    ) -> str:
-        return "Test suggestion"
-    
-    async def detect_patterns(self, ast: ASTNode) -> List[DesignPattern]:
-        return []
+def make_mock_plugin(language: str, extensions: List[str]) -> MockPlugin:
+    """Create a mock plugin for a language and its file extensions."""
+    return MockPlugin(language, extensions)
+
+
+_JAVA = ("java", [".java"])
+_TYPESCRIPT = ("typescript", [".ts", ".tsx"])
 
 
 class TestPluginManager:
     """Test cases for PluginManager."""
     
-    def test_register_plugin(self):
+    @pytest.mark.parametrize("language,extensions", [_JAVA, _TYPESCRIPT])
+    def test_register_plugin(self, language, extensions):
         """Test plugin registration."""
         manager = PluginManager()
-        plugin = MockJavaPlugin()
+        plugin = make_mock_plugin(language, extensions)
         
         manager.register_plugin(plugin)
         
-        assert "java" in manager.list_supported_languages()
-        assert ".java" in manager.list_supported_extensions()
+        assert language in manager.list_supported_languages()
+        for ext in extensions:
+            assert ext in manager.list_supported_extensions()
     
-    def test_get_plugin_for_file(self):
+    @pytest.mark.parametrize("file_path,language", [
+        ("src/Main.java", "java"),
+        ("src/app.ts", "typescript"),
+        ("src/Component.tsx", "typescript"),
+        ("src/script.py", None),
+    ])
+    def test_get_plugin_for_file(self, file_path, language):
         """Test getting plugin by file extension."""
         manager = PluginManager()
-        java_plugin = MockJavaPlugin()
-        ts_plugin = MockTypeScriptPlugin()
-        
-        manager.register_plugin(java_plugin)
-        manager.register_plugin(ts_plugin)
-        
-        # Test Java file
-        plugin = manager.get_plugin_for_file("src/Main.java")
-        assert plugin is not None
-        assert plugin.language_name == "java"
-        
-        # Test TypeScript file
-        plugin = manager.get_plugin_for_file("src/app.ts")
-        assert plugin is not None
-        assert plugin.language_name == "typescript"
-        
-        # Test TSX file
-        plugin = manager.get_plugin_for_file("src/Component.tsx")
-        assert plugin is not None
-        assert plugin.language_name == "typescript"
-        
-        # Test unsupported file
-        plugin = manager.get_plugin_for_file("src/script.py")
-        assert plugin is None
+        manager.register_plugin(make_mock_plugin(*_JAVA))
+        manager.register_plugin(make_mock_plugin(*_TYPESCRIPT))
+        
+        plugin = manager.get_plugin_for_file(file_path)
+        
+        if language is None:
+            assert plugin is None
+        else:
+            assert plugin is not None
+            assert plugin.language_name == language
+    
+    def test_get_plugin_for_file_edge_cases(self):
+        """Test extension matching for mixed case, dotfiles and dotted directories."""
+        manager = PluginManager()
+        manager.register_plugin(make_mock_plugin(*_JAVA))
+        
+        assert manager.get_plugin_for_file("src/Main.JAVA").language_name == "java"
+        assert manager.get_plugin_for_file("src.java/Makefile") is None
+        assert manager.get_plugin_for_file("src/.java") is None
+        assert manager.get_plugin_for_file("README") is None
     
     def test_get_plugin_by_name(self):
         """Test getting plugin by language name."""
         manager = PluginManager()
-        plugin = MockJavaPlugin()
+        plugin = make_mock_plugin(*_JAVA)
         
         manager.register_plugin(plugin)
         
@@ -176,7 +142,7 @@ class TestPluginManager:
     def test_unregister_plugin(self):
         """Test plugin unregistration."""
         manager = PluginManager()
-        plugin = MockJavaPlugin()
+        plugin = make_mock_plugin(*_JAVA)
         
         manager.register_plugin(plugin)
         assert "java" in manager.list_supported_languages()
@@ -190,31 +156,29 @@ class TestPluginManager:
         result = manager.unregister_plugin("java")
         assert result is False
     
-    def test_multiple_extensions_same_language(self):
-        """Test plugin with multiple file extensions."""
+    @pytest.mark.parametrize("language,extensions", [_JAVA, _TYPESCRIPT])
+    def test_multiple_extensions_same_language(self, language, extensions):
+        """Test that every extension of a plugin maps to that plugin."""
         manager = PluginManager()
-        plugin = MockTypeScriptPlugin()
+        plugin = make_mock_plugin(language, extensions)
         
         manager.register_plugin(plugin)
         
-        # Both extensions should map to the same plugin
-        plugin_ts = manager.get_plugin_for_file("file.ts")
-        plugin_tsx = manager.get_plugin_for_file("file.tsx")
-        
-        assert plugin_ts is plugin_tsx
-        assert plugin_ts.language_name == "typescript"
+        for ext in extensions:
+            assert manager.get_plugin_for_file(f"file{ext}") is plugin
     
     def test_plugin_override_warning(self):
         """Test that registering a plugin twice logs a warning."""
         manager = PluginManager()
-        plugin1 = MockJavaPlugin()
-        plugin2 = MockJavaPlugin()
+        plugin1 = make_mock_plugin(*_JAVA)
+        plugin2 = make_mock_plugin(*_JAVA)
         
         manager.register_plugin(plugin1)
         manager.register_plugin(plugin2)  # Should log warning
         
         # Second plugin should override first
         assert manager.get_plugin("java") is plugin2
+        assert manager.get_plugin_for_file("Test.java") is plugin2
     
     def test_get_statistics(self):
         """Test getting plugin manager statistics."""
@@ -225,8 +189,8 @@ class TestPluginManager:
         assert stats["total_extensions"] == 0
         assert stats["languages"] == []
         
-        manager.register_plugin(MockJavaPlugin())
-        manager.register_plugin(MockTypeScriptPlugin())
+        manager.register_plugin(make_mock_plugin(*_JAVA))
+        manager.register_plugin(make_mock_plugin(*_TYPESCRIPT))
         
         stats = manager.get_statistics()
         assert stats["total_plugins"] == 2
@@ -262,6 +226,67 @@ analysis_rules:
         assert ".test" in config["file_extensions"]
         assert "rule1" in config["analysis_rules"]
     
+    def test_load_plugin_config_reloads_modified_file(self, tmp_path):
+        """Test that cached configuration is refreshed when config.yaml changes."""
+        manager = PluginManager()
+        plugin_dir = tmp_path / "test_plugin"
+        plugin_dir.mkdir()
+        
+        config_file = plugin_dir / "config.yaml"
+        config_file.write_text("name: test\nversion: 1.0.0\nfile_extensions:\n  - .test\n")
+        
+        first = manager.load_plugin_config(plugin_dir)
+        assert manager.load_plugin_config(plugin_dir) is first
+        
+        config_file.write_text("name: test\nversion: 2.0.0\nfile_extensions:\n  - .test\n")
+        stat = config_file.stat()
+        os.utime(config_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        
+        config = manager.load_plugin_config(plugin_dir)
+        assert config["version"] == "2.0.0"
+    
+    def test_load_plugin_config_reloads_resized_file_with_same_mtime(self, tmp_path):
+        """Test that a size change refreshes the cache when the mtime is unchanged."""
+        manager = PluginManager()
+        plugin_dir = tmp_path / "test_plugin"
+        plugin_dir.mkdir()
+        
+        config_file = plugin_dir / "config.yaml"
+        config_file.write_text("name: test\nversion: 1.0.0\nfile_extensions:\n  - .test\n")
+        stat = config_file.stat()
+        manager.load_plugin_config(plugin_dir)
+        
+        config_file.write_text("name: test\nversion: 1.0.10\nfile_extensions:\n  - .test\n")
+        os.utime(config_file, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        
+        config = manager.load_plugin_config(plugin_dir)
+        assert config["version"] == "1.0.10"
+    
+    def test_load_plugin_config_cache_is_bounded(self, tmp_path, monkeypatch):
+        """Test that the least recently used configuration is evicted."""
+        monkeypatch.setattr("plugins.manager._CONFIG_CACHE_SIZE", 2)
+        manager = PluginManager()
+        
+        plugin_dirs = []
+        for name in ("first", "second", "third"):
+            plugin_dir = tmp_path / name
+            plugin_dir.mkdir()
+            (plugin_dir / "config.yaml").write_text(
+                f"name: {name}\nversion: 1.0.0\nfile_extensions:\n  - .{name}\n"
+            )
+            plugin_dirs.append(plugin_dir)
+        
+        first = manager.load_plugin_config(plugin_dirs[0])
+        manager.load_plugin_config(plugin_dirs[1])
+        # Touch the first entry so the second becomes least recently used
+        assert manager.load_plugin_config(plugin_dirs[0]) is first
+        manager.load_plugin_config(plugin_dirs[2])
+        
+        cached_paths = [key[0] for key in manager._config_cache]
+        assert len(cached_paths) == 2
+        assert str(plugin_dirs[1] / "config.yaml") not in cached_paths
+        assert manager.load_plugin_config(plugin_dirs[0]) is first
+    
     def test_load_plugin_config_missing_file(self, tmp_path):
         """Test loading config from directory without config.yaml."""
         manager = PluginManager()
@@ -299,7 +324,6 @@ name: test
         with pytest.raises(ValueError):
             manager.load_plugin_config(plugin_dir)
     
-    @pytest.mark.asyncio
     async def test_initialize_plugins(self, tmp_path):
         """Test plugin initialization from directory."""
         manager = PluginManager()
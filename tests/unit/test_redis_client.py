@@ -4,10 +4,10 @@ Unit tests for Redis client wrapper.
 Tests Redis operations using fakeredis for isolated testing.
 """
 
+import json
 import pytest
-import time
 from datetime import datetime
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Dict, List
 
 import fakeredis
 
@@ -16,29 +16,66 @@ from app.models.agent import AgentState
 from app.models.pr_event import PREvent, PRMetadata
 
 
+# Fixed "current" Unix time for the timeout tests
+NOW = 1_700_000_000.0
+
+
+@pytest.fixture(scope="module")
+def fake_server() -> fakeredis.FakeServer:
+    """In-memory Redis server shared by the tests in this module."""
+    return fakeredis.FakeServer()
+
+
+@pytest.fixture(scope="module")
+async def fake_redis(fake_server: fakeredis.FakeServer) -> AsyncGenerator[fakeredis.FakeAsyncRedis, None]:
+    """Fakeredis connection to the shared server, closed once per module."""
+    connection = fakeredis.FakeAsyncRedis(server=fake_server, decode_responses=True)
+    
+    yield connection
+    
+    await connection.aclose()
+
+
 @pytest.fixture
-async def redis_client() -> AsyncGenerator[RedisClient, None]:
+async def redis_client(fake_redis: fakeredis.FakeAsyncRedis) -> AsyncGenerator[RedisClient, None]:
     """Create Redis client with fakeredis for testing."""
     client = RedisClient(redis_url="redis://localhost:6379/0")
     
     # Replace the real Redis client with fakeredis
-    fake_redis = fakeredis.FakeAsyncRedis(decode_responses=True)
     client._client = fake_redis
     
     yield client
     
-    # Cleanup
+    # Reset the shared server for the next test
     await fake_redis.flushdb()
-    await fake_redis.aclose()
 
 
-@pytest.fixture
+async def _bulk_enqueue(redis_client: RedisClient, events: List[PREvent]) -> None:
+    """
+    Push events onto the job queue in one pipelined round trip.
+    
+    Only for seeding tests that do not exercise enqueue_pr_review itself.
+    """
+    async with redis_client._client.pipeline(transaction=False) as pipe:
+        for event in events:
+            # Same encoding as RedisClient.enqueue_pr_review
+            pipe.rpush(RedisClient.JOB_QUEUE_KEY, json.dumps(event.model_dump(mode='json')))
+        await pipe.execute()
+
+
+async def _seed_timeouts(redis_client: RedisClient, timeouts: Dict[str, float]) -> None:
+    """Add agent timeouts with a single ZADD, bypassing add_agent_timeout."""
+    await redis_client._client.zadd(RedisClient.AGENT_TIMEOUTS_KEY, timeouts)
+
+
+@pytest.fixture(scope="session")
 def sample_agent_state() -> AgentState:
-    """Create sample agent state for testing."""
-    return AgentState(
+    """Create sample agent state for testing; shared, so tests must not modify it."""
+    # The values are known to be valid, so skip validation
+    return AgentState.model_construct(
         agent_id="agent_123",
         pr_id="pr_456",
-        pr_metadata=PRMetadata(
+        pr_metadata=PRMetadata.model_construct(
             pr_id="pr_456",
             repository_id="repo_789",
             source_branch="feature/test",
@@ -50,14 +87,14 @@ def sample_agent_state() -> AgentState:
             target_commit_id="def456"
         ),
         phase="initialize",
-        start_time=time.time()
+        start_time=0.0
     )
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_pr_event() -> PREvent:
-    """Create sample PR event for testing."""
-    return PREvent(
+    """Create sample PR event for testing; shared, so tests must not modify it."""
+    return PREvent.model_construct(
         event_type="git.pullrequest.created",
         pr_id="pr_456",
         repository_id="repo_789",
@@ -70,79 +107,56 @@ def sample_pr_event() -> PREvent:
     )
 
 
+def test_sample_fixtures_are_valid(sample_agent_state: AgentState, sample_pr_event: PREvent):
+    """Test that the unvalidated fixtures pass validation unchanged."""
+    for model in (sample_agent_state, sample_pr_event):
+        data = model.model_dump()
+        assert type(model).model_validate(data).model_dump() == data
+
+
 class TestAgentStateOperations:
     """Test agent state storage operations."""
     
-    @pytest.mark.asyncio
-    async def test_save_and_get_agent_state(
+    async def test_agent_state_lifecycle(
         self,
         redis_client: RedisClient,
         sample_agent_state: AgentState
     ):
-        """Test saving and retrieving agent state."""
-        # Save state
-        await redis_client.save_agent_state(sample_agent_state)
+        """Test saving, retrieving, updating and deleting agent state."""
+        agent_id = sample_agent_state.agent_id
         
-        # Retrieve state
-        retrieved_state = await redis_client.get_agent_state(sample_agent_state.agent_id)
-        
-        # Verify
-        assert retrieved_state is not None
-        assert retrieved_state.agent_id == sample_agent_state.agent_id
-        assert retrieved_state.pr_id == sample_agent_state.pr_id
-        assert retrieved_state.phase == sample_agent_state.phase
-    
-    @pytest.mark.asyncio
-    async def test_get_nonexistent_agent_state(self, redis_client: RedisClient):
-        """Test retrieving non-existent agent state returns None."""
-        state = await redis_client.get_agent_state("nonexistent_agent")
-        assert state is None
-    
-    @pytest.mark.asyncio
-    async def test_delete_agent_state(
-        self,
-        redis_client: RedisClient,
-        sample_agent_state: AgentState
-    ):
-        """Test deleting agent state."""
-        # Save state
+        # Save and retrieve state
         await redis_client.save_agent_state(sample_agent_state)
         
-        # Verify it exists
-        state = await redis_client.get_agent_state(sample_agent_state.agent_id)
+        state = await redis_client.get_agent_state(agent_id)
         assert state is not None
-        
-        # Delete state
-        await redis_client.delete_agent_state(sample_agent_state.agent_id)
-        
-        # Verify it's gone
-        state = await redis_client.get_agent_state(sample_agent_state.agent_id)
-        assert state is None
-    
-    @pytest.mark.asyncio
-    async def test_update_agent_phase(
-        self,
-        redis_client: RedisClient,
-        sample_agent_state: AgentState
-    ):
-        """Test updating agent phase."""
-        # Save initial state
-        await redis_client.save_agent_state(sample_agent_state)
+        assert state.agent_id == agent_id
+        assert state.pr_id == sample_agent_state.pr_id
+        assert state.phase == sample_agent_state.phase
         
         # Update phase
         new_phase = "line_analysis"
-        await redis_client.update_agent_phase(sample_agent_state.agent_id, new_phase)
+        await redis_client.update_agent_phase(agent_id, new_phase)
         
-        # Retrieve and verify
-        state = await redis_client.get_agent_state(sample_agent_state.agent_id)
+        state = await redis_client.get_agent_state(agent_id)
         assert state is not None
         assert state.phase == new_phase
+        
+        # Delete state
+        await redis_client.delete_agent_state(agent_id)
+        
+        state = await redis_client.get_agent_state(agent_id)
+        assert state is None
+    
+    async def test_get_nonexistent_agent_state(self, redis_client: RedisClient):
+        """Test retrieving non-existent agent state returns None."""
+        state = await redis_client.get_agent_state("nonexistent_agent")
+        assert state is None
 
 
 class TestJobQueueOperations:
     """Test job queue operations."""
     
-    @pytest.mark.asyncio
     async def test_enqueue_and_dequeue_pr_review(
         self,
         redis_client: RedisClient,
@@ -160,20 +174,18 @@ class TestJobQueueOperations:
         assert dequeued_event.pr_id == sample_pr_event.pr_id
         assert dequeued_event.repository_id == sample_pr_event.repository_id
     
-    @pytest.mark.asyncio
     async def test_dequeue_empty_queue(self, redis_client: RedisClient):
         """Test dequeuing from empty queue returns None."""
         event = await redis_client.dequeue_pr_review()
         assert event is None
     
-    @pytest.mark.asyncio
     async def test_queue_fifo_order(
         self,
         redis_client: RedisClient,
         sample_pr_event: PREvent
     ):
         """Test queue maintains FIFO order."""
-        # Create multiple events
+        # Create multiple events; model_copy does not re-run validation
         event1 = sample_pr_event.model_copy(update={"pr_id": "pr_1"})
         event2 = sample_pr_event.model_copy(update={"pr_id": "pr_2"})
         event3 = sample_pr_event.model_copy(update={"pr_id": "pr_3"})
@@ -192,7 +204,6 @@ class TestJobQueueOperations:
         assert dequeued2.pr_id == "pr_2"
         assert dequeued3.pr_id == "pr_3"
     
-    @pytest.mark.asyncio
     async def test_get_queue_length(
         self,
         redis_client: RedisClient,
@@ -204,8 +215,7 @@ class TestJobQueueOperations:
         assert length == 0
         
         # Add jobs
-        await redis_client.enqueue_pr_review(sample_pr_event)
-        await redis_client.enqueue_pr_review(sample_pr_event)
+        await _bulk_enqueue(redis_client, [sample_pr_event, sample_pr_event])
         
         # Check length
         length = await redis_client.get_queue_length()
@@ -222,7 +232,6 @@ class TestJobQueueOperations:
 class TestAgentTrackingOperations:
     """Test agent tracking set operations."""
     
-    @pytest.mark.asyncio
     async def test_add_and_get_active_agents(self, redis_client: RedisClient):
         """Test adding and retrieving active agents."""
         pr_id = "pr_123"
@@ -238,7 +247,6 @@ class TestAgentTrackingOperations:
         assert agent_id in agents
         assert len(agents) == 1
     
-    @pytest.mark.asyncio
     async def test_remove_active_agent(self, redis_client: RedisClient):
         """Test removing active agent."""
         pr_id = "pr_123"
@@ -258,7 +266,6 @@ class TestAgentTrackingOperations:
         agents = await redis_client.get_active_agents(pr_id)
         assert agent_id not in agents
     
-    @pytest.mark.asyncio
     async def test_has_active_agent(self, redis_client: RedisClient):
         """Test checking if PR has active agents."""
         pr_id = "pr_123"
@@ -275,7 +282,6 @@ class TestAgentTrackingOperations:
         has_agent = await redis_client.has_active_agent(pr_id)
         assert has_agent is True
     
-    @pytest.mark.asyncio
     async def test_multiple_agents_per_pr(self, redis_client: RedisClient):
         """Test tracking multiple agents for same PR."""
         pr_id = "pr_123"
@@ -298,11 +304,10 @@ class TestAgentTrackingOperations:
 class TestAgentTimeoutTracking:
     """Test agent timeout tracking operations."""
     
-    @pytest.mark.asyncio
     async def test_add_and_remove_agent_timeout(self, redis_client: RedisClient):
         """Test adding and removing agent timeout."""
         agent_id = "agent_123"
-        expiration = time.time() + 600  # 10 minutes from now
+        expiration = NOW + 600  # 10 minutes from now
         
         # Add timeout
         await redis_client.add_agent_timeout(agent_id, expiration)
@@ -311,22 +316,23 @@ class TestAgentTimeoutTracking:
         await redis_client.remove_agent_timeout(agent_id)
         
         # Verify it's gone (no expired agents)
-        expired = await redis_client.get_expired_agents(time.time() + 700)
+        expired = await redis_client.get_expired_agents(NOW + 700)
         assert agent_id not in expired
     
-    @pytest.mark.asyncio
     async def test_get_expired_agents(self, redis_client: RedisClient):
         """Test getting expired agents."""
-        current_time = time.time()
+        current_time = NOW
         
         # Add agents with different expiration times
         agent1 = "agent_1"
         agent2 = "agent_2"
         agent3 = "agent_3"
         
-        await redis_client.add_agent_timeout(agent1, current_time - 100)  # Expired
-        await redis_client.add_agent_timeout(agent2, current_time + 100)  # Not expired
-        await redis_client.add_agent_timeout(agent3, current_time - 50)   # Expired
+        await _seed_timeouts(redis_client, {
+            agent1: current_time - 100,  # Expired
+            agent2: current_time + 100,  # Not expired
+            agent3: current_time - 50,   # Expired
+        })
         
         # Get expired agents
         expired = await redis_client.get_expired_agents(current_time)
@@ -337,10 +343,9 @@ class TestAgentTimeoutTracking:
         assert agent2 not in expired
         assert len(expired) == 2
     
-    @pytest.mark.asyncio
     async def test_no_expired_agents(self, redis_client: RedisClient):
         """Test when no agents have expired."""
-        current_time = time.time()
+        current_time = NOW
         
         # Add agent that hasn't expired
         await redis_client.add_agent_timeout("agent_1", current_time + 600)
@@ -355,13 +360,11 @@ class TestAgentTimeoutTracking:
 class TestUtilityMethods:
     """Test utility methods."""
     
-    @pytest.mark.asyncio
     async def test_ping(self, redis_client: RedisClient):
         """Test Redis connection ping."""
         result = await redis_client.ping()
         assert result is True
     
-    @pytest.mark.asyncio
     async def test_clear_all_data(
         self,
         redis_client: RedisClient,
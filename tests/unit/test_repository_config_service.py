@@ -5,95 +5,107 @@ Tests repository CRUD operations, URL validation, and database interactions.
 """
 
 import pytest
+from types import MappingProxyType
 from unittest.mock import AsyncMock, MagicMock, patch
 from datetime import datetime
 
 from app.services.repository_config import (
+    _AZURE_DEVOPS_URL_PATTERN,
     RepositoryConfigService,
     RepositoryValidationError
 )
 from app.models.repository import Repository, RepositoryCreate
 
 
-class TestRepositoryURLValidation:
-    """Test repository URL validation and parsing."""
+# Fixed created_at/updated_at for mock database rows
+FROZEN_TS = datetime(2024, 1, 1, 0, 0, 0)
+
+# Read-only rows returned by the mocked SELECTs for monitored repositories
+_REPO_ROW = MappingProxyType({
+    'id': '123',
+    'organization': 'myorg',
+    'project': 'myproject',
+    'repository_name': 'myrepo',
+    'repository_url': 'https://dev.azure.com/myorg/myproject/_git/myrepo',
+    'service_hook_id': None,
+    'created_at': FROZEN_TS,
+    'updated_at': FROZEN_TS
+})
+_REPO_ROW_2 = MappingProxyType({
+    **_REPO_ROW,
+    'id': '456',
+    'organization': 'org2',
+    'project': 'proj2',
+    'repository_name': 'repo2',
+    'repository_url': 'https://dev.azure.com/org2/proj2/_git/repo2',
+    'service_hook_id': 'hook123',
+})
+
+
+class _AsyncCM:
+    """Async context manager that yields a fixed value."""
     
-    def test_validate_valid_url(self):
-        """Test validation of valid Azure DevOps URL."""
-        service = RepositoryConfigService()
-        
-        url = "https://dev.azure.com/myorg/myproject/_git/myrepo"
-        result = service.validate_repository_url(url)
-        
-        assert result['organization'] == 'myorg'
-        assert result['project'] == 'myproject'
-        assert result['repository_name'] == 'myrepo'
+    def __init__(self, value):
+        self.value = value
     
-    def test_validate_url_with_trailing_slash(self):
-        """Test validation of URL with trailing slash."""
-        service = RepositoryConfigService()
-        
-        url = "https://dev.azure.com/myorg/myproject/_git/myrepo/"
-        result = service.validate_repository_url(url)
-        
-        assert result['organization'] == 'myorg'
-        assert result['project'] == 'myproject'
-        assert result['repository_name'] == 'myrepo'
+    async def __aenter__(self):
+        return self.value
     
-    def test_validate_url_with_special_characters(self):
-        """Test validation of URL with special characters in names."""
-        service = RepositoryConfigService()
-        
-        url = "https://dev.azure.com/my-org/my.project/_git/my_repo"
-        result = service.validate_repository_url(url)
-        
-        assert result['organization'] == 'my-org'
-        assert result['project'] == 'my.project'
-        assert result['repository_name'] == 'my_repo'
+    async def __aexit__(self, *exc_info):
+        return None
+
+
+class TestRepositoryURLValidation:
+    """Test repository URL validation and parsing."""
     
-    def test_validate_invalid_url_wrong_domain(self):
-        """Test validation fails for wrong domain."""
-        service = RepositoryConfigService()
-        
-        url = "https://github.com/myorg/myrepo"
-        
-        with pytest.raises(RepositoryValidationError) as exc_info:
-            service.validate_repository_url(url)
-        
-        assert "Invalid Azure DevOps repository URL format" in str(exc_info.value)
+    @pytest.fixture(scope="class")
+    def service(self):
+        """Create one RepositoryConfigService for the validation tests."""
+        return RepositoryConfigService()
     
-    def test_validate_invalid_url_missing_git(self):
-        """Test validation fails for URL missing _git segment."""
-        service = RepositoryConfigService()
-        
-        url = "https://dev.azure.com/myorg/myproject/myrepo"
-        
-        with pytest.raises(RepositoryValidationError) as exc_info:
-            service.validate_repository_url(url)
+    @pytest.mark.parametrize("url,expected", [
+        (
+            "https://dev.azure.com/myorg/myproject/_git/myrepo",
+            ("myorg", "myproject", "myrepo"),
+        ),
+        # Trailing slash
+        (
+            "https://dev.azure.com/myorg/myproject/_git/myrepo/",
+            ("myorg", "myproject", "myrepo"),
+        ),
+        # Special characters in names
+        (
+            "https://dev.azure.com/my-org/my.project/_git/my_repo",
+            ("my-org", "my.project", "my_repo"),
+        ),
+    ])
+    def test_validate_valid_url(self, service, url, expected):
+        """Test validation of valid Azure DevOps URLs."""
+        result = service.validate_repository_url(url)
         
-        assert "Invalid Azure DevOps repository URL format" in str(exc_info.value)
+        assert (result['organization'], result['project'], result['repository_name']) == expected
     
-    def test_validate_invalid_url_missing_parts(self):
-        """Test validation fails for incomplete URL."""
-        service = RepositoryConfigService()
-        
-        url = "https://dev.azure.com/myorg/_git/myrepo"
-        
+    @pytest.mark.parametrize("url", [
+        # Wrong domain
+        "https://github.com/myorg/myrepo",
+        # Missing _git segment
+        "https://dev.azure.com/myorg/myproject/myrepo",
+        # Missing project
+        "https://dev.azure.com/myorg/_git/myrepo",
+        # HTTP instead of HTTPS
+        "http://dev.azure.com/myorg/myproject/_git/myrepo",
+    ])
+    def test_validate_invalid_url(self, service, url):
+        """Test validation fails for malformed URLs."""
         with pytest.raises(RepositoryValidationError) as exc_info:
             service.validate_repository_url(url)
         
         assert "Invalid Azure DevOps repository URL format" in str(exc_info.value)
     
-    def test_validate_invalid_url_http_instead_of_https(self):
-        """Test validation fails for HTTP instead of HTTPS."""
-        service = RepositoryConfigService()
-        
-        url = "http://dev.azure.com/myorg/myproject/_git/myrepo"
-        
-        with pytest.raises(RepositoryValidationError) as exc_info:
-            service.validate_repository_url(url)
-        
-        assert "Invalid Azure DevOps repository URL format" in str(exc_info.value)
+    def test_url_pattern_is_shared(self, service):
+        """Test that the URL pattern is compiled once, not per instance."""
+        assert service._azure_devops_url_pattern is _AZURE_DEVOPS_URL_PATTERN
+        assert RepositoryConfigService()._azure_devops_url_pattern is _AZURE_DEVOPS_URL_PATTERN
 
 
 class TestRepositoryConfigService:
@@ -105,20 +117,28 @@ class TestRepositoryConfigService:
         return RepositoryConfigService()
     
     @pytest.fixture
-    def mock_pool(self):
-        """Create a mock connection pool."""
-        pool = MagicMock()
-        return pool
-    
-    @pytest.fixture
-    def mock_connection(self):
-        """Create a mock database connection."""
-        conn = AsyncMock()
-        cursor = AsyncMock()
-        cursor.__aenter__ = AsyncMock(return_value=cursor)
-        cursor.__aexit__ = AsyncMock(return_value=None)
-        conn.cursor = MagicMock(return_value=cursor)
-        return conn, cursor
+    def pool_conn_cursor(self, service):
+        """
+        Wire a mock pool, connection and cursor into the service.
+        
+        Only the awaited methods are AsyncMocks; the acquire and cursor
+        contexts are plain _AsyncCM passthroughs. Tests set the return
+        values of cursor.fetchone and cursor.fetchall.
+        """
+        cursor = MagicMock(name="cursor")
+        cursor.execute = AsyncMock()
+        cursor.fetchone = AsyncMock()
+        cursor.fetchall = AsyncMock()
+        
+        conn = MagicMock(name="conn")
+        conn.cursor.return_value = _AsyncCM(cursor)
+        conn.commit = AsyncMock()
+        
+        pool = MagicMock(name="pool")
+        pool.acquire.return_value = _AsyncCM(conn)
+        
+        service._pool = pool
+        return pool, conn, cursor
     
     def test_parse_database_url(self, service):
         """Test parsing of database URL."""
@@ -140,31 +160,15 @@ class TestRepositoryConfigService:
         assert result['port'] == 3306
         assert result['database'] == 'testdb'
     
-    @pytest.mark.asyncio
-    async def test_add_repository_success(self, service, mock_connection):
+    async def test_add_repository_success(self, service, pool_conn_cursor):
         """Test successful repository addition."""
-        conn, cursor = mock_connection
-        
-        # Mock pool and connection
-        service._pool = MagicMock()
-        service._pool.acquire = MagicMock()
-        service._pool.acquire.return_value.__aenter__ = AsyncMock(return_value=conn)
-        service._pool.acquire.return_value.__aexit__ = AsyncMock(return_value=None)
+        _, conn, cursor = pool_conn_cursor
         
         # Mock cursor operations
-        cursor.fetchone = AsyncMock(side_effect=[
+        cursor.fetchone.side_effect = [
             None,  # No existing repository
-            {  # Inserted repository
-                'id': '123',
-                'organization': 'myorg',
-                'project': 'myproject',
-                'repository_name': 'myrepo',
-                'repository_url': 'https://dev.azure.com/myorg/myproject/_git/myrepo',
-                'service_hook_id': None,
-                'created_at': datetime.now(),
-                'updated_at': datetime.now()
-            }
-        ])
+            _REPO_ROW,  # Inserted repository
+        ]
         cursor.lastrowid = 123
         
         # Test
@@ -180,19 +184,12 @@ class TestRepositoryConfigService:
         assert cursor.execute.call_count == 3  # Check existing, insert, select inserted
         assert conn.commit.called
     
-    @pytest.mark.asyncio
-    async def test_add_repository_duplicate(self, service, mock_connection):
+    async def test_add_repository_duplicate(self, service, pool_conn_cursor):
         """Test adding duplicate repository raises error."""
-        conn, cursor = mock_connection
-        
-        # Mock pool and connection
-        service._pool = MagicMock()
-        service._pool.acquire = MagicMock()
-        service._pool.acquire.return_value.__aenter__ = AsyncMock(return_value=conn)
-        service._pool.acquire.return_value.__aexit__ = AsyncMock(return_value=None)
+        _, conn, cursor = pool_conn_cursor
         
         # Mock cursor to return existing repository
-        cursor.fetchone = AsyncMock(return_value={'id': '123'})
+        cursor.fetchone.return_value = {'id': '123'}
         
         # Test
         repo_create = RepositoryCreate(
@@ -204,7 +201,6 @@ class TestRepositoryConfigService:
         
         assert "already exists" in str(exc_info.value)
     
-    @pytest.mark.asyncio
     async def test_add_repository_invalid_url(self, service):
         """Test adding repository with invalid URL."""
         repo_create = RepositoryCreate(
@@ -214,191 +210,77 @@ class TestRepositoryConfigService:
         with pytest.raises(RepositoryValidationError):
             await service.add_repository(repo_create)
     
-    @pytest.mark.asyncio
-    async def test_remove_repository_success(self, service, mock_connection):
-        """Test successful repository removal."""
-        conn, cursor = mock_connection
-        
-        # Mock pool and connection
-        service._pool = MagicMock()
-        service._pool.acquire = MagicMock()
-        service._pool.acquire.return_value.__aenter__ = AsyncMock(return_value=conn)
-        service._pool.acquire.return_value.__aexit__ = AsyncMock(return_value=None)
-        
-        # Mock cursor to return existing repository
-        cursor.fetchone = AsyncMock(return_value={'id': '123'})
-        
-        # Test
-        await service.remove_repository('123')
-        
-        # Assertions
-        assert cursor.execute.call_count == 2
-        assert conn.commit.called
-    
-    @pytest.mark.asyncio
-    async def test_remove_repository_not_found(self, service, mock_connection):
-        """Test removing non-existent repository raises error."""
-        conn, cursor = mock_connection
-        
-        # Mock pool and connection
-        service._pool = MagicMock()
-        service._pool.acquire = MagicMock()
-        service._pool.acquire.return_value.__aenter__ = AsyncMock(return_value=conn)
-        service._pool.acquire.return_value.__aexit__ = AsyncMock(return_value=None)
-        
-        # Mock cursor to return no repository
-        cursor.fetchone = AsyncMock(return_value=None)
-        
-        # Test
-        with pytest.raises(ValueError) as exc_info:
-            await service.remove_repository('999')
-        
-        assert "not found" in str(exc_info.value)
+    @pytest.mark.parametrize("existing,error", [
+        ({'id': '123'}, None),
+        (None, "not found"),
+    ])
+    async def test_remove_repository(self, service, pool_conn_cursor, existing, error):
+        """Test repository removal, and that a missing repository raises an error."""
+        _, conn, cursor = pool_conn_cursor
+        
+        # Mock cursor lookup of the repository
+        cursor.fetchone.return_value = existing
+        
+        if error is None:
+            await service.remove_repository('123')
+            
+            assert cursor.execute.call_count == 2
+            assert conn.commit.called
+        else:
+            with pytest.raises(ValueError) as exc_info:
+                await service.remove_repository('999')
+            
+            assert error in str(exc_info.value)
     
-    @pytest.mark.asyncio
-    async def test_list_repositories(self, service, mock_connection):
+    async def test_list_repositories(self, service, pool_conn_cursor):
         """Test listing all repositories."""
-        conn, cursor = mock_connection
-        
-        # Mock pool and connection
-        service._pool = MagicMock()
-        service._pool.acquire = MagicMock()
-        service._pool.acquire.return_value.__aenter__ = AsyncMock(return_value=conn)
-        service._pool.acquire.return_value.__aexit__ = AsyncMock(return_value=None)
+        _, conn, cursor = pool_conn_cursor
         
         # Mock cursor to return multiple repositories
-        cursor.fetchall = AsyncMock(return_value=[
-            {
-                'id': '123',
-                'organization': 'org1',
-                'project': 'proj1',
-                'repository_name': 'repo1',
-                'repository_url': 'https://dev.azure.com/org1/proj1/_git/repo1',
-                'service_hook_id': None,
-                'created_at': datetime.now(),
-                'updated_at': datetime.now()
-            },
-            {
-                'id': '456',
-                'organization': 'org2',
-                'project': 'proj2',
-                'repository_name': 'repo2',
-                'repository_url': 'https://dev.azure.com/org2/proj2/_git/repo2',
-                'service_hook_id': 'hook123',
-                'created_at': datetime.now(),
-                'updated_at': datetime.now()
-            }
-        ])
+        cursor.fetchall.return_value = [_REPO_ROW, _REPO_ROW_2]
         
         # Test
         result = await service.list_repositories()
         
         # Assertions
         assert len(result) == 2
-        assert result[0].organization == 'org1'
+        assert result[0].organization == 'myorg'
         assert result[1].organization == 'org2'
         assert result[1].service_hook_id == 'hook123'
     
-    @pytest.mark.asyncio
-    async def test_is_monitored_true(self, service, mock_connection):
-        """Test checking if repository is monitored returns True."""
-        conn, cursor = mock_connection
-        
-        # Mock pool and connection
-        service._pool = MagicMock()
-        service._pool.acquire = MagicMock()
-        service._pool.acquire.return_value.__aenter__ = AsyncMock(return_value=conn)
-        service._pool.acquire.return_value.__aexit__ = AsyncMock(return_value=None)
+    @pytest.mark.parametrize("existing,expected", [
+        ({'id': '123'}, True),
+        (None, False),
+    ])
+    async def test_is_monitored(self, service, pool_conn_cursor, existing, expected):
+        """Test checking whether a repository is monitored."""
+        _, conn, cursor = pool_conn_cursor
         
-        # Mock cursor to return repository
-        cursor.fetchone = AsyncMock(return_value={'id': '123'})
+        # Mock cursor lookup of the repository
+        cursor.fetchone.return_value = existing
         
-        # Test
         result = await service.is_monitored('123')
         
-        # Assertions
-        assert result is True
+        assert result is expected
     
-    @pytest.mark.asyncio
-    async def test_is_monitored_false(self, service, mock_connection):
-        """Test checking if repository is monitored returns False."""
-        conn, cursor = mock_connection
-        
-        # Mock pool and connection
-        service._pool = MagicMock()
-        service._pool.acquire = MagicMock()
-        service._pool.acquire.return_value.__aenter__ = AsyncMock(return_value=conn)
-        service._pool.acquire.return_value.__aexit__ = AsyncMock(return_value=None)
-        
-        # Mock cursor to return no repository
-        cursor.fetchone = AsyncMock(return_value=None)
-        
-        # Test
-        result = await service.is_monitored('999')
-        
-        # Assertions
-        assert result is False
-    
-    @pytest.mark.asyncio
-    async def test_get_repository_by_url(self, service, mock_connection):
-        """Test getting repository by URL."""
-        conn, cursor = mock_connection
-        
-        # Mock pool and connection
-        service._pool = MagicMock()
-        service._pool.acquire = MagicMock()
-        service._pool.acquire.return_value.__aenter__ = AsyncMock(return_value=conn)
-        service._pool.acquire.return_value.__aexit__ = AsyncMock(return_value=None)
-        
-        # Mock cursor to return repository
-        cursor.fetchone = AsyncMock(return_value={
-            'id': '123',
-            'organization': 'myorg',
-            'project': 'myproject',
-            'repository_name': 'myrepo',
-            'repository_url': 'https://dev.azure.com/myorg/myproject/_git/myrepo',
-            'service_hook_id': None,
-            'created_at': datetime.now(),
-            'updated_at': datetime.now()
-        })
-        
-        # Test
-        result = await service.get_repository_by_url(
-            'https://dev.azure.com/myorg/myproject/_git/myrepo'
-        )
-        
-        # Assertions
-        assert result is not None
-        assert result.organization == 'myorg'
-        assert result.project == 'myproject'
-    
-    @pytest.mark.asyncio
-    async def test_get_repository_by_id(self, service, mock_connection):
-        """Test getting repository by ID."""
-        conn, cursor = mock_connection
-        
-        # Mock pool and connection
-        service._pool = MagicMock()
-        service._pool.acquire = MagicMock()
-        service._pool.acquire.return_value.__aenter__ = AsyncMock(return_value=conn)
-        service._pool.acquire.return_value.__aexit__ = AsyncMock(return_value=None)
-        
-        # Mock cursor to return repository
-        cursor.fetchone = AsyncMock(return_value={
-            'id': '123',
-            'organization': 'myorg',
-            'project': 'myproject',
-            'repository_name': 'myrepo',
-            'repository_url': 'https://dev.azure.com/myorg/myproject/_git/myrepo',
-            'service_hook_id': None,
-            'created_at': datetime.now(),
-            'updated_at': datetime.now()
-        })
-        
-        # Test
-        result = await service.get_repository_by_id('123')
-        
-        # Assertions
-        assert result is not None
-        assert result.id == '123'
-        assert result.organization == 'myorg'
+    @pytest.mark.parametrize("method,key", [
+        ("get_repository_by_url", 'https://dev.azure.com/myorg/myproject/_git/myrepo'),
+        ("get_repository_by_id", '123'),
+    ])
+    @pytest.mark.parametrize("row", [_REPO_ROW, None])
+    async def test_get_repository(self, service, pool_conn_cursor, method, key, row):
+        """Test getting a repository by URL or ID, found and not found."""
+        _, conn, cursor = pool_conn_cursor
+        
+        # Mock cursor to return the repository row
+        cursor.fetchone.return_value = row
+        
+        result = await getattr(service, method)(key)
+        
+        if row is None:
+            assert result is None
+        else:
+            assert result is not None
+            assert result.id == '123'
+            assert result.organization == 'myorg'
+            assert result.project == 'myproject'
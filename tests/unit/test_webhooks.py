@@ -2,151 +2,174 @@
 Unit tests for webhook endpoints.
 """
 
+import json
+import httpx
 import pytest
-from unittest.mock import AsyncMock, patch, MagicMock
-import hashlib
+from unittest.mock import AsyncMock, patch
 import hmac
 
 # Skip tests if fastapi is not installed
 pytest.importorskip("fastapi")
 
-from fastapi.testclient import TestClient
-from app.main import app
+from app.api.webhooks import verify_webhook_signature
 from app.config import settings
 
 
-@pytest.fixture
-def client():
-    """Create test client."""
-    return TestClient(app)
+_WEBHOOK_SECRET_BYTES = settings.webhook_secret.encode()
 
+# Signed bodies are posted as these exact bytes, so the signature always matches
+try:
+    import orjson
+    _dumps = orjson.dumps
+except ImportError:
+    _JSON_ENCODER = json.JSONEncoder().encode
+    
+    def _dumps(obj) -> bytes:
+        return _JSON_ENCODER(obj).encode()
+
+
+@pytest.fixture(scope="session")
+async def client():
+    """Create an async client that calls the FastAPI application in-process."""
+    # Imported here so collecting this module does not build the whole app
+    from app.main import app
+    
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as async_client:
+        yield async_client
 
-@pytest.fixture
+
+@pytest.fixture(scope="module")
 def mock_pr_monitor():
-    """Mock PR Monitor."""
+    """Mock PR Monitor, patched once for the whole module."""
     with patch('app.api.webhooks.pr_monitor') as mock:
         mock.process_pr_event = AsyncMock()
         yield mock
 
 
-def generate_signature(payload: bytes, secret: str) -> str:
-    """Generate webhook signature."""
-    return hmac.new(
-        secret.encode(),
-        payload,
-        hashlib.sha256
-    ).hexdigest()
+def generate_signature(payload: bytes) -> str:
+    """Generate webhook signature with the configured secret."""
+    # One-shot C implementation; same hex digest as hmac.new(...).hexdigest()
+    return hmac.digest(_WEBHOOK_SECRET_BYTES, payload, 'sha256').hex()
+
+
+# Payloads are serialized and signed once, at import, outside the test bodies
+PR_CREATED_PAYLOAD = {
+    "eventType": "git.pullrequest.created",
+    "resource": {
+        "pullRequestId": 123,
+        "repository": {"id": "repo-123"},
+        "sourceRefName": "refs/heads/feature",
+        "targetRefName": "refs/heads/main",
+        "createdBy": {"displayName": "Test User"},
+        "title": "Test PR",
+        "description": "Test description",
+        "creationDate": "2024-01-01T00:00:00Z"
+    }
+}
+PR_CREATED_PAYLOAD_BYTES = _dumps(PR_CREATED_PAYLOAD)
+PR_CREATED_SIG = generate_signature(PR_CREATED_PAYLOAD_BYTES)
+
+NON_PR_PAYLOAD = {
+    "eventType": "git.push",
+    "resource": {}
+}
+NON_PR_PAYLOAD_BYTES = _dumps(NON_PR_PAYLOAD)
+NON_PR_SIG = generate_signature(NON_PR_PAYLOAD_BYTES)
+
+MISSING_FIELDS_PAYLOAD = {
+    "eventType": "git.pullrequest.created",
+    "resource": {
+        # Missing pullRequestId and repository
+        "sourceRefName": "refs/heads/feature",
+        "targetRefName": "refs/heads/main"
+    }
+}
+MISSING_FIELDS_PAYLOAD_BYTES = _dumps(MISSING_FIELDS_PAYLOAD)
+MISSING_FIELDS_SIG = generate_signature(MISSING_FIELDS_PAYLOAD_BYTES)
 
 
-def test_webhook_endpoint_exists(client):
+async def test_webhook_endpoint_exists(client):
     """Test that webhook endpoint exists."""
     # Send a request without signature (should fail)
-    response = client.post("/webhooks/azure-devops/pr", json={})
+    response = await client.post("/webhooks/azure-devops/pr", json={})
     
     # Should return 401 (unauthorized) not 404 (not found)
     assert response.status_code == 401
 
 
-def test_webhook_invalid_signature(client):
+async def test_webhook_invalid_signature(client):
     """Test webhook with invalid signature."""
-    payload = {
-        "eventType": "git.pullrequest.created",
-        "resource": {
-            "pullRequestId": 123,
-            "repository": {"id": "repo-123"},
-            "sourceRefName": "refs/heads/feature",
-            "targetRefName": "refs/heads/main",
-            "createdBy": {"displayName": "Test User"},
-            "title": "Test PR",
-            "creationDate": "2024-01-01T00:00:00Z"
-        }
-    }
-    
-    response = client.post(
+    response = await client.post(
         "/webhooks/azure-devops/pr",
-        json=payload,
-        headers={"X-Hub-Signature-256": "invalid_signature"}
+        content=PR_CREATED_PAYLOAD_BYTES,
+        headers={
+            "Content-Type": "application/json",
+            "X-Hub-Signature-256": "invalid_signature"
+        }
     )
     
     assert response.status_code == 401
     assert "Invalid webhook signature" in response.json()["detail"]
 
 
-def test_webhook_valid_pr_created(client, mock_pr_monitor):
-    """Test webhook with valid PR created event."""
-    payload = {
-        "eventType": "git.pullrequest.created",
-        "resource": {
-            "pullRequestId": 123,
-            "repository": {"id": "repo-123"},
-            "sourceRefName": "refs/heads/feature",
-            "targetRefName": "refs/heads/main",
-            "createdBy": {"displayName": "Test User"},
-            "title": "Test PR",
-            "description": "Test description",
-            "creationDate": "2024-01-01T00:00:00Z"
-        }
-    }
-    
-    # Generate valid signature
-    import json
-    payload_bytes = json.dumps(payload).encode()
-    signature = generate_signature(payload_bytes, settings.webhook_secret)
-    
-    response = client.post(
-        "/webhooks/azure-devops/pr",
-        json=payload,
-        headers={"X-Hub-Signature-256": signature}
-    )
-    
-    assert response.status_code == 200
-    assert response.json()["status"] == "accepted"
-    assert "123" in response.json()["message"]
-
-
-def test_webhook_ignores_non_pr_events(client):
-    """Test webhook ignores non-PR events."""
-    payload = {
-        "eventType": "git.push",
-        "resource": {}
-    }
+def test_webhook_uses_constant_time_compare():
+    """Test that signatures are checked with hmac.compare_digest."""
+    with patch('app.api.webhooks.hmac.compare_digest', wraps=hmac.compare_digest) as compare:
+        assert verify_webhook_signature(PR_CREATED_PAYLOAD_BYTES, PR_CREATED_SIG) is True
+        assert verify_webhook_signature(PR_CREATED_PAYLOAD_BYTES, "0" * len(PR_CREATED_SIG)) is False
     
-    # Generate valid signature
-    import json
-    payload_bytes = json.dumps(payload).encode()
-    signature = generate_signature(payload_bytes, settings.webhook_secret)
-    
-    response = client.post(
+    assert compare.call_count == 2
+    for provided, expected in (call.args for call in compare.call_args_list):
+        assert len(provided) == len(expected)
+
+
+_SIGNED_CASES = [
+    pytest.param(
+        PR_CREATED_PAYLOAD_BYTES, PR_CREATED_SIG,
+        200, {"status": "accepted"}, ("message", "123"),
+        id="valid_pr_created"
+    ),
+    pytest.param(
+        NON_PR_PAYLOAD_BYTES, NON_PR_SIG,
+        200, {"status": "ignored"}, None,
+        id="ignores_non_pr_events"
+    ),
+    pytest.param(
+        MISSING_FIELDS_PAYLOAD_BYTES, MISSING_FIELDS_SIG,
+        400, {}, ("detail", "Invalid PR event payload"),
+        id="missing_required_fields"
+    ),
+]
+
+
+@pytest.mark.parametrize(
+    "payload_bytes,signature,expected_status,expected_fields,expected_text",
+    _SIGNED_CASES
+)
+async def test_webhook_signed_request(
+    client,
+    mock_pr_monitor,
+    payload_bytes,
+    signature,
+    expected_status,
+    expected_fields,
+    expected_text
+):
+    """Test validly signed webhook requests: accepted, ignored and rejected events."""
+    response = await client.post(
         "/webhooks/azure-devops/pr",
-        json=payload,
-        headers={"X-Hub-Signature-256": signature}
-    )
-    
-    assert response.status_code == 200
-    assert response.json()["status"] == "ignored"
-
-
-def test_webhook_missing_required_fields(client):
-    """Test webhook with missing required fields."""
-    payload = {
-        "eventType": "git.pullrequest.created",
-        "resource": {
-            # Missing pullRequestId and repository
-            "sourceRefName": "refs/heads/feature",
-            "targetRefName": "refs/heads/main"
+        content=payload_bytes,
+        headers={
+            "Content-Type": "application/json",
+            "X-Hub-Signature-256": signature
         }
-    }
-    
-    # Generate valid signature
-    import json
-    payload_bytes = json.dumps(payload).encode()
-    signature = generate_signature(payload_bytes, settings.webhook_secret)
-    
-    response = client.post(
-        "/webhooks/azure-devops/pr",
-        json=payload,
-        headers={"X-Hub-Signature-256": signature}
     )
     
-    assert response.status_code == 400
-    assert "Invalid PR event payload" in response.json()["detail"]
+    assert response.status_code == expected_status
+    data = response.json()
+    for key, value in expected_fields.items():
+        assert data[key] == value
+    if expected_text is not None:
+        key, text = expected_text
+        assert text in data[key]